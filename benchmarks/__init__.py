@@ -0,0 +1,12 @@
+"""
+Query-budget benchmarks for the `bookmarks` app.
+
+1. `seed` builds a synthetic dataset around a fixed "probe" user.
+2. `suite` measures every Pathmaker route, every view in `bookmarks/views.py` and the
+   manager methods against that probe user.
+3. `run` is the command line entrypoint: `python -m benchmarks.run --scale large`.
+4. `compare` checks a run against `budgets.json` and, optionally, a previous run:
+   `python -m benchmarks.compare head.json --base base.json`.
+5. `urls` times the action urls of bookmarkable instances through `reverse()` and
+   through the url templates of the registry: `python -m benchmarks.urls`.
+"""
@@ -0,0 +1,87 @@
+"""
+Check a benchmark run against the checked-in query budgets and, optionally, a
+previous run. Exits with status 1 on any query regression.
+
+```zsh
+.venv> python -m benchmarks.compare head.json --base base.json
+```
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+BUDGETS = Path(__file__).parent / "budgets.json"
+
+TIMINGS = ("sql_ms", "render_ms", "wall_ms")
+
+
+def load_budgets(path: Path = BUDGETS) -> dict[str, dict]:
+    return json.loads(Path(path).read_text())
+
+
+def compare(
+    head: dict[str, dict],
+    budgets: dict[str, dict],
+    base: Optional[dict[str, dict]] = None,
+    time_tolerance: float = 0.25,
+) -> tuple[list[str], list[str]]:
+    """Return `(failures, warnings)` for the `head` results. A failure is a
+    measurement without a budget, one that exceeds its query budget, or one that
+    issues more queries than in `base`. Timings slower than `base` by more than
+    `time_tolerance` are only warnings since they depend on the machine."""
+    failures, warnings = [], []
+    for key, result in head.items():
+        if key not in budgets:
+            failures.append(f"{key}: no budget, add one to {BUDGETS.name}")
+            continue
+        if result["queries"] > (limit := budgets[key]["queries"]):
+            failures.append(f"{key}: {result['queries']} queries, budget is {limit}")
+        if not base or key not in base:
+            continue
+        if result["queries"] > (before := base[key]["queries"]):
+            failures.append(f"{key}: {result['queries']} queries, was {before}")
+        for timing in TIMINGS:
+            old, new = base[key][timing], result[timing]
+            if old and new > old * (1 + time_tolerance):
+                warnings.append(f"{key}: {timing} {new:.2f}, was {old:.2f}")
+    return failures, warnings
+
+
+def format_table(head: dict[str, dict], base: Optional[dict[str, dict]] = None):
+    lines = [
+        f"{'measurement':<50} {'queries':>9} " + " ".join(f"{t:>11}" for t in TIMINGS)
+    ]
+    for key, result in sorted(head.items()):
+        queries = str(result["queries"])
+        if base and key in base:
+            queries = f"{base[key]['queries']}->{queries}"
+        timings = " ".join(f"{result[t]:>11.2f}" for t in TIMINGS)
+        lines.append(f"{key:<50} {queries:>9} {timings}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("head", help="Results of `python -m benchmarks.run`")
+    parser.add_argument("--base", help="Results of an earlier run to compare with")
+    parser.add_argument("--budgets", default=BUDGETS)
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    head = json.loads(Path(args.head).read_text())["results"]
+    base = json.loads(Path(args.base).read_text())["results"] if args.base else None
+    failures, warnings = compare(
+        head, load_budgets(args.budgets), base, args.time_tolerance
+    )
+    print(format_table(head, base))
+    for warning in warnings:
+        print(f"SLOWER {warning}")
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Seed a throwaway test database and measure the suite against it.
+
+```zsh
+.venv> python -m benchmarks.run --scale large --repeat 5 --output head.json
+```
+"""
+import argparse
+import json
+import os
+import sys
+from time import perf_counter
+
+import django
+
+
+def main(argv=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+
+    from .seed import SCALES, seed
+    from .suite import run_suite
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as json to this path")
+    args = parser.parse_args(argv)
+
+    settings.DEBUG = False  # otherwise every query is kept in connection.queries
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        start = perf_counter()
+        probe = seed(SCALES[args.scale])
+        print(f"Seeded {args.scale} in {perf_counter() - start:.1f}s", file=sys.stderr)
+        results = run_suite(probe, repeat=args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    report = {"scale": args.scale, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
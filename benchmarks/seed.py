@@ -0,0 +1,125 @@
+import random
+from dataclasses import dataclass
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+
+from bookmarks.models import Bookmark, TagItem
+from examples.models import SampleBook, SampleQuote
+
+PROBE_USERNAME = "probe"
+"""The user whose bookmarks are measured; see `seed_probe()`"""
+
+PROBE_TAGS = ["probe-alpha", "probe-beta", "probe-gamma"]
+"""Every bookmark of the probe user is tagged with the first two of these"""
+
+PROBE_BOOKMARKS_PER_MODEL = 6
+"""The probe user has a fixed profile so that query counts are independent of scale"""
+
+
+@dataclass
+class Scale:
+    """Volume of the background data surrounding the probe user. The background
+    affects timings but, barring N+1 queries, never the number of queries."""
+
+    users: int
+    books: int
+    quotes: int
+    bookmarks: int
+    tags: int
+    batch_size: int = 5000
+
+
+SCALES = {
+    "tiny": Scale(users=5, books=20, quotes=40, bookmarks=60, tags=30),
+    "small": Scale(users=200, books=500, quotes=2000, bookmarks=20000, tags=2000),
+    "large": Scale(users=2000, books=5000, quotes=20000, bookmarks=300000, tags=20000),
+}
+
+
+def seed(scale: Scale, seed: int = 42):
+    """Populate the database with the background data of `scale` and return the
+    probe user. Rows are inserted with `bulk_create()` in batches."""
+    rng = random.Random(seed)
+    User = get_user_model()
+
+    probe = User.objects.create(username=PROBE_USERNAME, password="!")
+    User.objects.bulk_create(
+        [User(username=f"user-{i}", password="!") for i in range(scale.users)],
+        batch_size=scale.batch_size,
+    )
+    user_ids = list(User.objects.values_list("id", flat=True))
+
+    SampleBook.objects.bulk_create(
+        [
+            SampleBook(title=f"Book {i}", excerpt="", author_id=rng.choice(user_ids))
+            for i in range(scale.books)
+        ],
+        batch_size=scale.batch_size,
+    )
+    book_ids = list(SampleBook.objects.values_list("id", flat=True))
+    SampleQuote.objects.bulk_create(
+        [
+            SampleQuote(quote=f"Quote {i}", book_id=rng.choice(book_ids))
+            for i in range(scale.quotes)
+        ],
+        batch_size=scale.batch_size,
+    )
+    quote_ids = list(SampleQuote.objects.values_list("id", flat=True))
+
+    TagItem.objects.bulk_create(
+        [TagItem(name=f"tag-{i}") for i in range(scale.tags)]
+        + [TagItem(name=name) for name in PROBE_TAGS],
+        batch_size=scale.batch_size,
+    )
+
+    seed_background(rng, scale, user_ids, book_ids, quote_ids, probe)
+    seed_probe(probe, book_ids, quote_ids)
+    return probe
+
+
+def seed_background(rng, scale: Scale, user_ids, book_ids, quote_ids, probe):
+    """Spread `scale.bookmarks` unique bookmarks across all non-probe users, then tag
+    each one with up to three random tags."""
+    book_type = ContentType.objects.get_for_model(SampleBook)
+    quote_type = ContentType.objects.get_for_model(SampleQuote)
+    targets = [(book_type.id, str(pk)) for pk in book_ids] + [
+        (quote_type.id, str(pk)) for pk in quote_ids
+    ]
+    others = [pk for pk in user_ids if pk != probe.pk]
+    per_user = min(len(targets), max(1, scale.bookmarks // len(others)))
+
+    batch = []
+    for user_id in others:
+        for ct_id, object_id in rng.sample(targets, per_user):
+            bookmark = Bookmark(
+                bookmarker_id=user_id, content_type_id=ct_id, object_id=object_id
+            )
+            bookmark.set_typed_object_id()
+            batch.append(bookmark)
+        if len(batch) >= scale.batch_size:
+            Bookmark.objects.bulk_create(batch)
+            batch = []
+    Bookmark.objects.bulk_create(batch)
+
+    Tagged = Bookmark.tags.through
+    tag_ids = list(
+        TagItem.objects.exclude(name__in=PROBE_TAGS).values_list("id", flat=True)
+    )
+    rows = []
+    bookmark_ids = Bookmark.objects.values_list("id", flat=True).order_by("id")
+    for bookmark_id in bookmark_ids.iterator(chunk_size=scale.batch_size):
+        for tag_id in rng.sample(tag_ids, rng.randint(0, min(3, len(tag_ids)))):
+            rows.append(Tagged(bookmark_id=bookmark_id, tagitem_id=tag_id))
+        if len(rows) >= scale.batch_size:
+            Tagged.objects.bulk_create(rows)
+            rows = []
+    Tagged.objects.bulk_create(rows)
+
+
+def seed_probe(probe, book_ids, quote_ids):
+    """The probe user bookmarks the first few books and quotes and tags each with
+    the first two `PROBE_TAGS`; the third is submitted by the `add_tags` cases."""
+    for model, pks in ((SampleBook, book_ids), (SampleQuote, quote_ids)):
+        for obj in model.objects.filter(pk__in=pks[:PROBE_BOOKMARKS_PER_MODEL]):
+            obj.add_tags(probe, PROBE_TAGS[:2])
@@ -0,0 +1,258 @@
+from dataclasses import asdict, dataclass
+from statistics import median
+from time import perf_counter
+from typing import Callable
+from urllib.parse import urlencode
+
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.urls import reverse
+
+from bookmarks.managers import encode_cursor
+from bookmarks.models import Bookmark, TagItem
+from bookmarks.utils import (
+    ADD_TAGS,
+    BULK,
+    DEL_TAG,
+    GET_ITEM,
+    LAUNCH_MODAL,
+    TOGGLE_STATUS,
+    Pathmaker,
+)
+from bookmarks.views import (
+    annotated_tags,
+    autocomplete_tags,
+    bookmarked_objs,
+    export_bookmarks,
+    filter_objects_by_tag_model,
+    get_panels,
+)
+from examples.models import SampleBook, SampleQuote
+
+from .seed import PROBE_TAGS
+
+BOOKMARKABLES = [SampleBook, SampleQuote]
+
+METHODS = {
+    GET_ITEM: "get",
+    LAUNCH_MODAL: "get",
+    ADD_TAGS: "post",
+    DEL_TAG: "delete",
+    TOGGLE_STATUS: "put",
+}
+"""The http method each Pathmaker action expects"""
+
+
+@dataclass
+class Measurement:
+    queries: int
+    sql_ms: float
+    render_ms: float
+    wall_ms: float
+
+
+class QueryProbe:
+    """Wraps every query executed on `connection` to count and time it."""
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += perf_counter() - start
+            self.count += 1
+
+
+def measure(func: Callable, repeat: int = 5) -> Measurement:
+    """Call `func` once to warm up caches, then `repeat` times, each inside a
+    transaction that is rolled back so that mutating views see the same state. If
+    `func` returns an unrendered or a streaming response, its rendering is timed
+    separately. The `check` set on a case, if any, is asserted after each call,
+    before the rollback and outside of the count."""
+    runs = []
+    for _ in range(repeat + 1):
+        probe = QueryProbe()
+        with transaction.atomic():
+            with connection.execute_wrapper(probe):
+                start = perf_counter()
+                result = func()
+                rendered = perf_counter()
+                if hasattr(result, "render") and not result.is_rendered:
+                    result.render()
+                elif getattr(result, "streaming", False):
+                    for _ in result.streaming_content:
+                        pass
+                end = perf_counter()
+            if check := getattr(func, "check", None):
+                assert check(), check.__doc__
+            transaction.set_rollback(True)
+        runs.append((probe.count, probe.elapsed, end - rendered, end - start))
+    runs = runs[1:]
+    return Measurement(
+        queries=max(run[0] for run in runs),
+        sql_ms=round(median(run[1] for run in runs) * 1000, 3),
+        render_ms=round(median(run[2] for run in runs) * 1000, 3),
+        wall_ms=round(median(run[3] for run in runs) * 1000, 3),
+    )
+
+
+def route_cases(probe) -> dict[str, Callable]:
+    """One case per `Pathmaker.make_patterns()` route with a `pk`, for each
+    bookmarkable model, targeting an object already bookmarked by `probe`."""
+    factory = RequestFactory()
+    cases = {}
+    for model in BOOKMARKABLES:
+        obj = model.get_bookmarks_by_user(probe).first()
+        model_name = model._meta.model_name
+        for pattern in Pathmaker(model).make_patterns():
+            converters = pattern.pattern.converters
+            if "pk" not in converters:
+                continue  # fake urls are only filled up during runtime
+            act = pattern.name.removesuffix(f"_{model_name}")
+            kwargs = {"pk": str(obj.pk)}
+            key = pattern.name
+            if "user_slug" in converters:
+                kwargs["user_slug"] = probe.username
+                key += ":user"
+            data = {
+                ADD_TAGS: {"tags": f"{PROBE_TAGS[2]}, {PROBE_TAGS[0]}"},
+                DEL_TAG: {"tag": PROBE_TAGS[0]},
+            }.get(act, {})
+            path = reverse(f"examples:{pattern.name}", kwargs=kwargs)
+            cases[key] = make_case(
+                factory, METHODS[act], path, probe, pattern.callback, kwargs, data
+            )
+            if act == DEL_TAG:
+                cases[key].check = tag_removed(obj, probe, PROBE_TAGS[0])
+    return cases
+
+
+def bulk_cases(probe, size: int = 200) -> dict[str, Callable]:
+    """Tag `size` instances of each bookmarkable model at once through its bulk
+    route, half of them not yet bookmarked by `probe`."""
+    factory = RequestFactory()
+    cases = {}
+    for model in BOOKMARKABLES:
+        mine = list(model.get_bookmarks_by_user(probe).values_list("pk", flat=True))
+        others = model.objects.exclude(pk__in=mine).values_list("pk", flat=True)
+        pks = mine[: size // 2]
+        pks += list(others[: size - len(pks)])
+        name = f"{BULK}_{model._meta.model_name}"
+        data = {"action": "add_tags", "pk": pks, "tags": PROBE_TAGS[2]}
+        cases[f"{name}:add_tags"] = make_case(
+            factory,
+            "post",
+            reverse(f"examples:{name}"),
+            probe,
+            model.bulk_func,
+            {},
+            data,
+        )
+    return cases
+
+
+def tag_removed(obj, user, name: str) -> Callable[[], bool]:
+    def check() -> bool:
+        """del_tag did not remove the tag"""
+        return not obj.bookmarks.filter(bookmarker=user, tags__name=name).exists()
+
+    return check
+
+
+def make_case(factory, method, path, user, view, kwargs, data):
+    if method in ("delete", "put"):  # htmx sends these as query parameters
+        path, data = f"{path}?{urlencode(data)}" if data else path, ""
+
+    def case():
+        request = getattr(factory, method)(path, data=data)
+        request.user = user
+        return view(request, **kwargs)
+
+    return case
+
+
+def view_cases(probe) -> dict[str, Callable]:
+    """One case per view in `bookmarks/views.py`, as seen by `probe`."""
+    factory = RequestFactory()
+    tag_slug = PROBE_TAGS[0]
+    model_id = Bookmark.objects.filter(bookmarker=probe).first().content_type_id
+    views = {
+        "bookmarks:filter_objects_by_tag_models": (
+            filter_objects_by_tag_model,
+            {"tag_slug": tag_slug},
+        ),
+        "bookmarks:filter_objects_by_tag_models:model": (
+            filter_objects_by_tag_model,
+            {"tag_slug": tag_slug, "model_id": model_id},
+        ),
+        "bookmarks:annotated_tags": (annotated_tags, {}),
+        "bookmarks:bookmarked_objs": (bookmarked_objs, {}),
+        "bookmarks:export_bookmarks": (export_bookmarks, {}),
+    }
+    cases = {}
+    for key, (view, kwargs) in views.items():
+        path = reverse(key.removesuffix(":model"), kwargs=kwargs)
+        cases[key] = make_case(factory, "get", path, probe, view, kwargs, {})
+
+    cases["bookmarks:autocomplete_tags"] = make_case(
+        factory,
+        "get",
+        reverse("bookmarks:autocomplete_tags"),
+        probe,
+        autocomplete_tags,
+        {},
+        {"tags": "probe"},
+    )
+
+    first = Bookmark.objects.filter(bookmarker=probe).after().first()
+    cases["bookmarks:bookmarked_objs:page"] = make_case(
+        factory,
+        "get",
+        reverse("bookmarks:bookmarked_objs"),
+        probe,
+        bookmarked_objs,
+        {},
+        {"cursor": encode_cursor(first)},
+    )
+
+    items = [
+        f"{bookmark.content_type_id}:{bookmark.object_id}"
+        for bookmark in Bookmark.objects.filter(bookmarker=probe)
+    ]
+    cases["bookmarks:get_panels"] = make_case(
+        factory,
+        "get",
+        reverse("bookmarks:get_panels"),
+        probe,
+        get_panels,
+        {},
+        {"item": items},
+    )
+    return cases
+
+
+def manager_cases(probe) -> dict[str, Callable]:
+    """Manager methods, fully evaluated."""
+    tag = TagItem.objects.get(name=PROBE_TAGS[0])
+    return {
+        "UserAnnotations.made_by_user": lambda: list(
+            TagItem.tagged.made_by_user(probe, BOOKMARKABLES)
+        ),
+        "MarkedTags.extract_from": lambda: list(
+            Bookmark.objects_tagged.extract_from(probe, tag)
+        ),
+    }
+
+
+def run_suite(probe, repeat: int = 5) -> dict[str, dict]:
+    cases = (
+        route_cases(probe)
+        | bulk_cases(probe)
+        | view_cases(probe)
+        | manager_cases(probe)
+    )
+    return {key: asdict(measure(case, repeat)) for key, case in cases.items()}
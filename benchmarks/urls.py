@@ -0,0 +1,64 @@
+"""
+Time the action urls of unsaved bookmarkable instances, through `reverse()` and
+through the url templates of the registry; no database is needed.
+
+```zsh
+.venv> python -m benchmarks.urls --objects 1000 --repeat 5
+```
+"""
+import argparse
+import os
+from time import perf_counter
+
+import django
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+    from django.urls import reverse
+
+    from bookmarks.apps import registry
+    from bookmarks.utils import ADD_TAGS, DEL_TAG, GET_ITEM, LAUNCH_MODAL, TOGGLE_STATUS
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--objects", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    acts = (GET_ITEM, LAUNCH_MODAL, ADD_TAGS, DEL_TAG, TOGGLE_STATUS)
+    objs = [model(pk=pk) for model in registry.models for pk in range(args.objects)]
+
+    def reversed_urls():
+        for obj in objs:
+            entry = registry.get(type(obj))
+            for act in acts:
+                reverse(entry.url_name(act), args=(obj.pk,))
+
+    def templated_urls():
+        for obj in objs:
+            for act in acts:
+                obj.make_action_url(act)
+
+    templated_urls()  # warm up the templates, as the first request would
+    urls = len(objs) * len(acts)
+    reverse_s = best_of(reversed_urls, args.repeat)
+    template_s = best_of(templated_urls, args.repeat)
+    print(f"{urls} urls, best of {args.repeat}")
+    print(f"reverse():  {reverse_s * 1000:8.1f} ms  {urls / reverse_s:10.0f} urls/s")
+    print(f"templates:  {template_s * 1000:8.1f} ms  {urls / template_s:10.0f} urls/s")
+    print(f"speedup:    {reverse_s / template_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,135 @@
-from django.apps import AppConfig
+from dataclasses import dataclass, field
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.apps import AppConfig, apps
+from django.core.signals import setting_changed
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.urls import get_script_prefix, get_urlconf, reverse
+from django.utils.http import RFC3986_SUBDELIMS
+from django.utils.http import quote as url_quote
+
+PK_PLACEHOLDER = "__pk__"
+"""Reversed in place of a primary key, then split on to make a url template"""
+
+
+@dataclass
+class BookmarkableEntry:
+    """What the hot paths need to know about a concrete bookmarkable `model`."""
+
+    model: type[Model]
+    name: str
+    """The `verbose_name` of the model, same as its `ContentType.name`"""
+    url_prefix: str
+    """Prefix of the Pathmaker url names, e.g. `examples:` + `{act}_samplebook`"""
+    content_type_id: Optional[int] = field(default=None)
+    url_templates: dict[tuple, tuple[str, str]] = field(
+        default_factory=dict, repr=False
+    )
+    """(act, script prefix, urlconf): the url around the pk, see `action_url()`"""
+
+    @property
+    def id(self) -> Optional[int]:
+        """Lets an entry stand in for its `ContentType` in templates."""
+        return self.content_type_id
+
+    def url_name(self, act: str) -> str:
+        return f"{self.url_prefix}{act}_{self.model._meta.model_name}"
+
+    def action_url(self, act: str, pk) -> str:
+        """Same as `reverse(self.url_name(act), args=(pk,))` but the resolver is only
+        walked on the first call per `act`, with a placeholder pk; later calls
+        interpolate `pk` into the parts of the url around it, quoted the way
+        `reverse()` would."""
+        key = (act, get_script_prefix(), get_urlconf())
+        if (parts := self.url_templates.get(key)) is None:
+            url = reverse(self.url_name(act), args=(PK_PLACEHOLDER,))
+            head, _, tail = url.partition(PK_PLACEHOLDER)
+            parts = self.url_templates[key] = (head, tail)
+        head, tail = parts
+        return f"{head}{url_quote(str(pk), safe=RFC3986_SUBDELIMS + '~:@')}{tail}"
+
+
+class BookmarkableRegistry:
+    """Concrete subclasses of `AbstractBookmarkable`, including grandchildren, found
+    once when the app is ready. Their content type ids are fetched together on first
+    use, since the database cannot be queried while apps are being loaded, and are
+    forgotten after migrations since a flush recreates content types."""
+
+    def __init__(self):
+        self.entries: dict[type[Model], BookmarkableEntry] = {}
+        self.by_content_type: dict[int, BookmarkableEntry] = {}
+
+    def populate(self, abstract: type[Model]):
+        self.entries = {
+            model: BookmarkableEntry(
+                model=model,
+                name=str(model._meta.verbose_name),
+                url_prefix=f"{model._meta.app_label}:",
+            )
+            for model in apps.get_models()
+            if issubclass(model, abstract) and not model._meta.proxy
+        }
+        self.clear_content_types()
+
+    @property
+    def models(self) -> list[type[Model]]:
+        return list(self.entries)
+
+    def get(self, model: type[Model]) -> BookmarkableEntry:
+        return self.entries[model._meta.concrete_model]
+
+    def get_for_content_type(self, content_type_id: int) -> Optional[BookmarkableEntry]:
+        if not self.by_content_type:
+            self.load_content_types()
+        return self.by_content_type.get(content_type_id)
+
+    def content_type_id(self, model: type[Model]) -> int:
+        if (entry := self.get(model)).content_type_id is None:
+            self.load_content_types()
+        return entry.content_type_id
+
+    def load_content_types(self):
+        from django.contrib.contenttypes.models import ContentType
+
+        types = ContentType.objects.get_for_models(*self.entries)
+        for model, content_type in types.items():
+            self.entries[model].content_type_id = content_type.id
+        self.by_content_type = {e.content_type_id: e for e in self.entries.values()}
+
+    async def aload_content_types(self):
+        """Async load_content_types(), only if not yet loaded, so that the lookups
+        above need no query from async code."""
+        if not self.by_content_type:
+            await sync_to_async(self.load_content_types)()
+
+    def clear_content_types(self, **kwargs):
+        for entry in self.entries.values():
+            entry.content_type_id = None
+        self.by_content_type = {}
+
+    def clear_url_templates(self, setting: str = "ROOT_URLCONF", **kwargs):
+        """Connected to `setting_changed`, like Django's own url caches."""
+        if setting == "ROOT_URLCONF":
+            for entry in self.entries.values():
+                entry.url_templates.clear()
+
+
+registry = BookmarkableRegistry()
 
 
 class BookmarksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bookmarks"
+
+    def ready(self):
+        from .cache import invalidate_panel
+        from .models import AbstractBookmarkable
+
+        registry.populate(AbstractBookmarkable)
+        post_migrate.connect(registry.clear_content_types, dispatch_uid=__name__)
+        setting_changed.connect(registry.clear_url_templates, dispatch_uid=__name__)
+        for model in registry.models:
+            for signal in (post_save, post_delete):
+                signal.connect(invalidate_panel, sender=model)
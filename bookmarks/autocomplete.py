@@ -0,0 +1,89 @@
+"""
+Completion of tag names as they are typed, from a sorted list of the tags each user
+has used, kept in the memory of the process:
+
+```python
+BOOKMARKS_AUTOCOMPLETE_TTL = 60  # seconds, optional
+BOOKMARKS_AUTOCOMPLETE_USERS = 1000  # lists kept at most, optional
+```
+
+A list is loaded with one grouped query on the first keystroke of a user, then each
+keystroke is a binary search. The `bookmarks_changed` signal drops the list of the
+user in this process; lists in other processes expire after the TTL.
+"""
+from bisect import bisect_left
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.db.models import Count
+from django.dispatch import receiver
+
+from .models import TagItem
+from .signals import bookmarks_changed
+
+
+class UserTags:
+    """Names of the tags of a user in sorted order, each with its number of uses."""
+
+    def __init__(self, rows: list[tuple[str, int]]):
+        rows = sorted(rows)  # by codepoint, as bisect compares, not by db collation
+        self.names = [name for name, _ in rows]
+        self.uses = [uses for _, uses in rows]
+
+    def complete(self, prefix: str, limit: int) -> list[str]:
+        """Up to `limit` names starting with `prefix`, most used first. The names
+        starting with `prefix` are contiguous in sorted order, so only these are
+        visited."""
+        matches = []
+        index = bisect_left(self.names, prefix)
+        while index < len(self.names) and self.names[index].startswith(prefix):
+            matches.append((-self.uses[index], self.names[index]))
+            index += 1
+        return [name for _, name in sorted(matches)[:limit]]
+
+
+lists: OrderedDict[int, tuple[float, UserTags]] = OrderedDict()
+"""Least recently used first"""
+
+lock = Lock()
+
+
+def load_user_tags(user) -> UserTags:
+    rows = (
+        TagItem.objects.filter(bookmarked__bookmarker=user)
+        .values_list("name")
+        .annotate(uses=Count("bookmarked"))
+        .order_by()
+    )
+    return UserTags(list(rows))
+
+
+def get_user_tags(user) -> UserTags:
+    now = monotonic()
+    with lock:
+        if (found := lists.get(user.pk)) and found[0] > now:
+            lists.move_to_end(user.pk)
+            return found[1]
+    user_tags = load_user_tags(user)
+    ttl = getattr(settings, "BOOKMARKS_AUTOCOMPLETE_TTL", 60)
+    with lock:
+        lists[user.pk] = (now + ttl, user_tags)
+        lists.move_to_end(user.pk)
+        while len(lists) > getattr(settings, "BOOKMARKS_AUTOCOMPLETE_USERS", 1000):
+            lists.popitem(last=False)
+    return user_tags
+
+
+def complete_tags(user, prefix: str, limit: int) -> list[str]:
+    """Names of the tags of `user` starting with `prefix`, most used first."""
+    if not prefix:
+        return []
+    return get_user_tags(user).complete(prefix, limit)
+
+
+@receiver(bookmarks_changed)
+def on_bookmarks_changed(sender, user, **kwargs):
+    with lock:
+        lists.pop(user.pk, None)
@@ -0,0 +1,144 @@
+"""
+Per-user cache of bookmark state, enabled by naming one of the `CACHES` in settings:
+
+```python
+BOOKMARKS_CACHE = "default"
+BOOKMARKS_CACHE_TIMEOUT = 300  # seconds, optional
+```
+
+For each user and bookmarkable model, the cache holds a mapping of every bookmarked
+`object_id` to the `(id, name)` of its tags. Entries are keyed by a per-user version
+which the `bookmarks_changed` signal bumps, so a change to any of the user's bookmarks
+makes every entry of that user unreachable at once.
+
+The `object_content_for_panel` of bookmarkable instances can be cached as well, keyed
+by a per-instance version which `post_save` and `post_delete` of the instance bump:
+
+```python
+BOOKMARKS_PANEL_CACHE_TIMEOUT = 300  # seconds, requires BOOKMARKS_CACHE
+```
+
+Since only saving the instance itself invalidates its content, leave this unset if
+the content shows fields of related objects that change on their own.
+"""
+from collections import Counter
+from time import time_ns
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.dispatch import receiver
+from django.utils.safestring import SafeText
+
+from .apps import registry
+from .signals import bookmarks_changed
+
+stats = Counter()
+"""Process-wide `hits`, `misses` and `invalidations`, see `cache_stats()`"""
+
+
+def get_cache():
+    if alias := getattr(settings, "BOOKMARKS_CACHE", None):
+        return caches[alias]
+    return None
+
+
+def version_key(user_id) -> str:
+    return f"bookmarks:version:{user_id}"
+
+
+def get_version(cache, key: str) -> int:
+    """A missing version starts from the current time rather than from 1, so that
+    entries stored under an evicted version cannot be served again."""
+    if (version := cache.get(key)) is None:
+        cache.add(key, time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_user_states(
+    user, content_type_id: int, load: Callable[[], dict]
+) -> Optional[dict[str, list[tuple[int, str]]]]:
+    """The cached bookmark state of `user` on the model of `content_type_id`; on a
+    miss, the result of `load()` is cached. Returns None if the cache is disabled."""
+    if not (cache := get_cache()):
+        return None
+    version = get_version(cache, version_key(user.pk))
+    key = f"bookmarks:state:{user.pk}:{content_type_id}:{version}"
+    if (states := cache.get(key)) is not None:
+        stats["hits"] += 1
+        return states
+    stats["misses"] += 1
+    states = load()
+    cache.set(key, states, getattr(settings, "BOOKMARKS_CACHE_TIMEOUT", 300))
+    return states
+
+
+def invalidate_user(user_id):
+    if not (cache := get_cache()):
+        return
+    stats["invalidations"] += 1
+    try:
+        cache.incr(version_key(user_id))
+    except ValueError:  # no version yet, nothing cached
+        pass
+
+
+@receiver(bookmarks_changed)
+def on_bookmarks_changed(sender, user, **kwargs):
+    invalidate_user(user.pk)
+
+
+def get_panel_cache():
+    """The cache if both BOOKMARKS_CACHE and BOOKMARKS_PANEL_CACHE_TIMEOUT are set."""
+    if getattr(settings, "BOOKMARKS_PANEL_CACHE_TIMEOUT", None) is None:
+        return None
+    return get_cache()
+
+
+def panel_version_key(content_type_id: int, pk) -> str:
+    return f"bookmarks:panel_version:{content_type_id}:{pk}"
+
+
+def get_panel_contents(objs: list) -> dict[str, SafeText]:
+    """The `object_content_for_panel` of bookmarkable `objs` of the same model, keyed
+    by `pk` as a string; fragments missing from the cache are rendered and stored."""
+    if not (cache := get_panel_cache()) or not objs:
+        return {str(obj.pk): obj.object_content_for_panel for obj in objs}
+    content_type_id = registry.content_type_id(type(objs[0]))
+    version_keys = {
+        str(obj.pk): panel_version_key(content_type_id, obj.pk) for obj in objs
+    }
+    versions = cache.get_many(version_keys.values())
+    keys = {}
+    for pk, key in version_keys.items():
+        version = versions.get(key) or get_version(cache, key)
+        keys[pk] = f"bookmarks:panel:{content_type_id}:{pk}:{version}"
+    contents = cache.get_many(keys.values())
+    found, missed = {}, {}
+    for obj in objs:
+        pk = str(obj.pk)
+        if (content := contents.get(keys[pk])) is not None:
+            stats["panel_hits"] += 1
+            found[pk] = content
+        else:
+            stats["panel_misses"] += 1
+            found[pk] = missed[keys[pk]] = obj.object_content_for_panel
+    if missed:
+        cache.set_many(missed, settings.BOOKMARKS_PANEL_CACHE_TIMEOUT)
+    return found
+
+
+def invalidate_panel(sender, instance, **kwargs):
+    """Connected to `post_save` and `post_delete` of each bookmarkable model."""
+    if not (cache := get_panel_cache()):
+        return
+    try:
+        cache.incr(panel_version_key(registry.content_type_id(sender), instance.pk))
+    except ValueError:  # no version yet, nothing cached
+        pass
+
+
+def cache_stats() -> dict[str, int]:
+    keys = ("hits", "misses", "invalidations", "panel_hits", "panel_misses")
+    return {key: stats[key] for key in keys}
@@ -0,0 +1,31 @@
+from datetime import timedelta
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from bookmarks.models import TagItem
+
+
+class Command(BaseCommand):
+    help = "Delete the tags that no bookmark refers to anymore, a batch at a time"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=60,
+            help="Minutes since their creation before orphan tags are deleted",
+        )
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        deleted = TagItem.objects.delete_orphans(
+            batch_size=options["batch_size"],
+            min_age=timedelta(minutes=options["min_age"]),
+        )
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f"Deleted {deleted} orphan tags in {elapsed:.1f}s",
+            style_func=self.style.SUCCESS,
+        )
@@ -0,0 +1,28 @@
+import json
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from bookmarks.transfer import export_records
+
+
+class Command(BaseCommand):
+    help = "Export all tags and bookmarks as JSON Lines, see bookmarks.transfer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="Path to write to, else stdout")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        output = open(options["output"], "w") if options["output"] else self.stdout
+        start, rows = perf_counter(), 0
+        try:
+            for record in export_records(options["chunk_size"]):
+                output.write(json.dumps(record) + "\n")
+                rows += 1
+        finally:
+            if options["output"]:
+                output.close()
+        elapsed = perf_counter() - start
+        report = f"Exported {rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)"
+        self.stderr.write(report, style_func=self.style.SUCCESS)
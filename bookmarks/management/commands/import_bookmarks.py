@@ -0,0 +1,33 @@
+import sys
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from bookmarks.transfer import import_records
+
+
+class Command(BaseCommand):
+    help = "Import tags and bookmarks from JSON Lines made by export_bookmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to read from, or - for stdin")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        if options["path"] == "-":
+            counts = import_records(sys.stdin, options["batch_size"])
+        else:
+            with open(options["path"]) as lines:
+                counts = import_records(lines, options["batch_size"])
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            (
+                f"Read {counts['read']} rows in {elapsed:.1f}s"
+                f" ({counts['read'] / elapsed:.0f} rows/s): inserted {counts['tags']}"
+                f" tags, {counts['bookmarks']} bookmarks and {counts['tagged']} tags of"
+                f" bookmarks; skipped {counts['skipped']} bookmarks of unknown users or"
+                " content types"
+            ),
+            style_func=self.style.SUCCESS,
+        )
@@ -1,9 +1,309 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from typing import Optional
 
-from django.contrib.contenttypes.models import ContentType
-from django.db import models
-from django.db.models import Count, Q, Value
-from django.db.models.query import QuerySet
+from django.conf import settings
+from django.db import connections, models
+from django.db.models import Count, Exists, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Concat, Substr
+from django.db.models.query import ModelIterable, QuerySet
+from django.utils.timezone import now
+
+from .apps import BookmarkableEntry, registry
+
+
+class GroupConcat(models.Aggregate):
+    """Comma-separated values of the aggregated rows: `GROUP_CONCAT` in SQLite and
+    MySQL, `STRING_AGG` in PostgreSQL."""
+
+    function = "GROUP_CONCAT"
+    output_field = models.CharField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            function="STRING_AGG",
+            template="%(function)s(%(distinct)s%(expressions)s, ',')",
+            **extra_context,
+        )
+
+
+UUID_PARTS = ((1, 8), (9, 4), (13, 4), (17, 4), (21, 12))
+"""(start, length) of each dash-separated group of a 32 digit hex uuid"""
+
+
+def as_object_id(expression, model: models.Model, connection):
+    """Render `expression`, a reference to the primary key of `model`, as the text
+    stored in the generic `object_id`, i.e. `str(pk)`. Databases without a native
+    uuid type store a UUID as 32 hex digits, so the dashes of `str(uuid)` have to be
+    put back."""
+    if (
+        model._meta.pk.get_internal_type() == "UUIDField"
+        and not connection.features.has_native_uuid_field
+    ):
+        parts = [Substr(expression, start, size) for start, size in UUID_PARTS]
+        dashed = [x for part in parts for x in (part, Value("-"))][:-1]
+        return Concat(*dashed, output_field=models.CharField())
+    return Cast(expression, models.CharField())
+
+
+TYPED_OBJECT_IDS = {
+    "AutoField": "object_id_int",
+    "BigAutoField": "object_id_int",
+    "SmallAutoField": "object_id_int",
+    "IntegerField": "object_id_int",
+    "BigIntegerField": "object_id_int",
+    "SmallIntegerField": "object_id_int",
+    "PositiveIntegerField": "object_id_int",
+    "PositiveBigIntegerField": "object_id_int",
+    "PositiveSmallIntegerField": "object_id_int",
+    "UUIDField": "object_id_uuid",
+}
+"""Typed column of `Bookmark` that can hold the primary key of a given field type"""
+
+
+def typed_object_id_field(model: models.Model) -> Optional[str]:
+    """The typed column of `Bookmark` that mirrors `object_id` for targets of
+    `model`, if its primary key is an integer or a UUID."""
+    return TYPED_OBJECT_IDS.get(model._meta.pk.get_internal_type())
+
+
+def use_typed_object_ids() -> bool:
+    """Opt-in with `BOOKMARKS_TYPED_OBJECT_IDS = True` once existing rows have been
+    backfilled, see migration 0006."""
+    return getattr(settings, "BOOKMARKS_TYPED_OBJECT_IDS", False)
+
+
+def target_lookup(model: models.Model, value, connection, lookup: str = "") -> dict:
+    """Filter kwargs that match bookmarks to targets of `model` by `value`: a `pk`, a
+    list of them with `lookup="in"`, or an expression such as `OuterRef("pk")`. With
+    typed object ids, the integer or uuid column is compared to the primary key as
+    is, so that joins can use the index of the target's primary key."""
+    suffix = f"__{lookup}" if lookup else ""
+    if use_typed_object_ids() and (field := typed_object_id_field(model)):
+        return {f"{field}{suffix}": value}
+    if hasattr(value, "resolve_expression"):
+        return {f"object_id{suffix}": as_object_id(value, model, connection)}
+    if lookup == "in":
+        return {"object_id__in": [str(v) for v in value]}
+    return {"object_id": str(value)}
+
+
+def encode_cursor(bookmark) -> str:
+    """Opaque position of the `bookmark` in the (created, id) order of a listing."""
+    raw = f"{bookmark.created.isoformat()},{bookmark.pk}"
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError if the `cursor` was not made by encode_cursor()."""
+    try:
+        created, pk = urlsafe_b64decode(cursor.encode()).decode().split(",")
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Bad cursor {cursor}") from e
+    return datetime.fromisoformat(created), int(pk)
+
+
+def paginate(rows: list, size: int) -> tuple[list, Optional[str]]:
+    """The first `size` of `rows` fetched one beyond the page, with the cursor of the
+    next page if there is one."""
+    if len(rows) > size:
+        return rows[:size], encode_cursor(rows[size - 1])
+    return rows, None
+
+
+def prefetch_content_objects(bookmarks: list, using: Optional[str] = None):
+    """Fill the `content_object` cache of each of the `bookmarks` with one query per
+    content type, rather than one per bookmark, following the
+    `bookmark_select_related` of each bookmarkable model."""
+    by_type = defaultdict(list)
+    for bookmark in bookmarks:
+        by_type[bookmark.content_type_id].append(bookmark)
+    for content_type_id, group in by_type.items():
+        if entry := registry.get_for_content_type(content_type_id):
+            model = entry.model
+        elif not (model := group[0].content_type.model_class()):
+            continue  # stale content type
+        pks = {model._meta.pk.to_python(bookmark.object_id) for bookmark in group}
+        objs = (
+            model._base_manager.db_manager(using)
+            .select_related(*getattr(model, "bookmark_select_related", ()))
+            .filter(pk__in=pks)
+        )
+        found = {str(obj.pk): obj for obj in objs}
+        for bookmark in group:
+            field = bookmark._meta.get_field("content_object")
+            field.set_cached_value(bookmark, found.get(bookmark.object_id))
+
+
+class BookmarkQuerySet(QuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prefetch_content = False
+        self._content_done = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._prefetch_content = self._prefetch_content
+        return clone
+
+    def _fetch_all(self):
+        super()._fetch_all()
+        if (
+            self._prefetch_content
+            and not self._content_done
+            and self._iterable_class is ModelIterable
+        ):
+            prefetch_content_objects(self._result_cache, self.db)
+            self._content_done = True
+
+    def with_content_objects(self) -> QuerySet:
+        """Bookmarks with their `content_type` joined and their `content_object`
+        fetched in bulk on evaluation, see prefetch_content_objects(); the generic
+        `prefetch_related("content_object")` cannot apply per-model hints."""
+        clone = self.select_related("content_type")
+        clone._prefetch_content = True
+        return clone
+
+    def for_objects(self, model: models.Model, pks: list) -> QuerySet:
+        """Bookmarks on the instances of `model` with primary keys in `pks`."""
+        return self.filter(
+            content_type=registry.content_type_id(model),
+            **target_lookup(model, pks, connections[self.db], "in"),
+        )
+
+    def delete_rows(self) -> int:
+        """Delete the bookmarks, with their own rows of `tags`, in one statement each
+        rather than collecting them first as `delete()` does; no signals are sent.
+        Returns the number of bookmarks deleted."""
+        self.model.tags.through.objects.filter(bookmark__in=self).delete()
+        return self._raw_delete(self.db)  # no cascade left to collect
+
+    def after(self, cursor: Optional[str] = None) -> QuerySet:
+        """Bookmarks in (created, id) order, following the `cursor` if given. Seeking
+        past the cursor on an index costs the same on every page, unlike an OFFSET
+        which reads and discards the rows of every page before."""
+        qs = self.order_by("created", "id")
+        if not cursor:
+            return qs
+        created, pk = decode_cursor(cursor)
+        # the first condition alone bounds the index range scan
+        return qs.filter(created__gte=created).filter(
+            Q(created__gt=created) | Q(id__gt=pk)
+        )
+
+    def page(self, cursor: Optional[str], size: int) -> tuple[list, Optional[str]]:
+        """Up to `size` bookmarks following the `cursor`, with the cursor of the next
+        page, if any. One more row than needed is fetched to know if there is one."""
+        rows = list(self.after(cursor)[: size + 1])
+        return paginate(rows, size)
+
+    async def apage(
+        self, cursor: Optional[str], size: int
+    ) -> tuple[list, Optional[str]]:
+        """Async page(), fetching the rows through the async ORM; the content objects
+        of with_content_objects() are fetched along in the same thread."""
+        rows = [row async for row in self.after(cursor)[: size + 1]]
+        return paginate(rows, size)
+
+
+class BookmarkableQuerySet(QuerySet):
+    def for_panels(self) -> QuerySet:
+        """Instances with the relations of their `bookmark_select_related` joined,
+        as needed by `object_content_for_panel`."""
+        return self.select_related(*self.model.bookmark_select_related)
+
+    def user_bookmarks(self, user) -> QuerySet:
+        """Bookmarks of the `user` on the instance referenced by `OuterRef("pk")`,
+        for use in a correlated subquery."""
+        bookmarks = self.model._meta.get_field("bookmarks").related_model
+        return bookmarks.objects.filter(
+            content_type=registry.content_type_id(self.model),
+            bookmarker=user,
+            **target_lookup(self.model, OuterRef("pk"), connections[self.db]),
+        )
+
+    def bookmarks_of(self, user) -> QuerySet:
+        """The `Bookmark`s of the `user` on these instances, to be listed a page at a
+        time with `BookmarkQuerySet.page()` rather than all at once. Unless all
+        instances are meant, they are matched through a subquery of their pks."""
+        bookmarks = self.model._meta.get_field("bookmarks").related_model
+        qs = bookmarks.objects.filter(
+            content_type=registry.content_type_id(self.model), bookmarker=user
+        )
+        if not self.query.has_filters():
+            return qs
+        if use_typed_object_ids() and (field := typed_object_id_field(self.model)):
+            return qs.filter(**{f"{field}__in": self.values("pk")})
+        target = as_object_id("pk", self.model, connections[self.db])
+        return qs.filter(object_id__in=self.values(target=target))
+
+    def bookmarked_by(self, user) -> QuerySet:
+        """Instances that the `user` has bookmarked, filtered in the database through
+        a correlated subquery so that no list of ids is sent back and forth."""
+        return self.filter(Exists(self.user_bookmarks(user)))
+
+    def annotate_bookmarks(self, user) -> QuerySet:
+        """Annotate each instance with `user_bookmarked`, whether the `user` has
+        bookmarked it, and `user_tag_names`, the comma-separated names of the tags the
+        `user` added to it, in the same SELECT. Listing N instances therefore costs one
+        query rather than N `is_bookmarked()` calls."""
+        if not user.is_authenticated:
+            return self.annotate(
+                user_bookmarked=Value(False),
+                user_tag_names=Value(None, output_field=models.CharField()),
+            )
+        marks = self.user_bookmarks(user)
+        names = (
+            marks.order_by()
+            .values("bookmarker")
+            .annotate(names=GroupConcat("tags__name"))
+            .values("names")
+        )
+        return self.annotate(
+            user_bookmarked=Exists(marks), user_tag_names=Subquery(names)
+        )
+
+
+class TagItemQuerySet(QuerySet):
+    def orphans(self, min_age: timedelta = timedelta(hours=1)) -> QuerySet:
+        """Tags that no bookmark refers to and that were created more than `min_age`
+        ago, so that a tag inserted by `add_tags()` is not taken for an orphan in the
+        moment before it is attached."""
+        tagged = self.model.bookmarked.through.objects.filter(tagitem=OuterRef("pk"))
+        return self.filter(created__lt=now() - min_age).exclude(Exists(tagged))
+
+    def delete_orphans(
+        self, batch_size: int = 1000, min_age: timedelta = timedelta(hours=1)
+    ) -> int:
+        """Delete `orphans()`, `batch_size` at a time, each batch by a single DELETE
+        whose condition repeats the check for references, so that a tag attached
+        since the batch was selected is left alone rather than cascaded away from
+        the bookmark it was attached to. No signals are sent. Returns the number of
+        tags deleted."""
+        deleted, last_pk = 0, 0
+        while True:
+            batch = list(
+                self.orphans(min_age)
+                .filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch:
+                return deleted
+            orphans = self.filter(pk__in=batch).orphans(min_age)
+            deleted += orphans._raw_delete(orphans.db)
+            last_pk = batch[-1]
+
+
+@dataclass
+class AnnotatedTag:
+    name: str
+    counts: list[tuple[BookmarkableEntry, int]]
+    """Number of bookmarks tagged `name` per bookmarkable model"""
 
 
 class UserAnnotations(models.Manager):
@@ -20,39 +320,55 @@ class UserAnnotations(models.Manager):
         )
         return qs
 
-    def prep_for_annotation(self, user, model: models.Model):
-        """Using the prefix of the model `label`, generate values for `_count`, `_id`,
-        and `_slug`.
-
-        e.g if the model is `SampleBook`, the generated keys are `samplebook_count`,
-        `samplebook_id`, and `samplebook_slug`.
-
-        1. The `_id` refers to the `contenttype` id.
-        2. The `_slug` refers to the lowercased name of the model.
-        3. The `_count` refers to the number of instances bookmarked per type.
-
-        See tags/tag_list_annotated_models.html for how used."""
-        label = model._meta.model_name.lower()
-        type_of_model = ContentType.objects.get_for_model(model)
-        by_type = Q(bookmarked__content_type=type_of_model)
-        by_user = Q(bookmarked__bookmarker=user)
-        return {
-            f"{label}_count": Count("bookmarked", filter=by_type & by_user),
-            f"{label}_id": Value(type_of_model.id),
-            f"{label}_slug": Value(model._meta.verbose_name),
-        }
-
-    def made_by_user(self, user, models: list[models.Model]) -> QuerySet:
-        """Tags filtered by user then each tag is annotated with different
-        contenttypes."""
-        qs = self.filter_by_user(user)
-        for model in models:
-            values = self.prep_for_annotation(user, model)
-            qs = qs.annotate(**values)
-        return qs
+    def made_by_user(
+        self, user, models: Optional[list[models.Model]] = None
+    ) -> list[AnnotatedTag]:
+        """Tags used by the `user`, each with the number of bookmarks per content type
+        it was used on; optionally limited to the given bookmarkable `models`. A single
+        query grouped by (tag, content type) is pivoted in Python so that its cost does
+        not grow with the number of bookmarkable models.
+
+        See tags/tag_list_annotated_model_list.html for how used."""
+        return self.pivot_counts(self.counts_by_type(user, models))
+
+    async def amade_by_user(
+        self, user, models: Optional[list[models.Model]] = None
+    ) -> list[AnnotatedTag]:
+        """Async made_by_user(), iterating over the same rows through the async ORM."""
+        await registry.aload_content_types()
+        rows = [row async for row in self.counts_by_type(user, models)]
+        return self.pivot_counts(rows)
+
+    def counts_by_type(
+        self, user, models: Optional[list[models.Model]] = None
+    ) -> QuerySet:
+        """(tag name, content type, count) rows of made_by_user(). Both conditions go
+        in the same `filter()`, otherwise the multi-valued `bookmarked` would be joined
+        twice and counted over the second join, which includes other users'
+        bookmarks."""
+        conditions = {"bookmarked__bookmarker": user}
+        if models:
+            types = [registry.content_type_id(model) for model in models]
+            conditions["bookmarked__content_type__in"] = types
+        return (
+            self.filter(**conditions)
+            .values_list("name", "bookmarked__content_type")
+            .annotate(count=Count("bookmarked"))
+            .order_by("-created", "bookmarked__content_type")
+        )
+
+    @staticmethod
+    def pivot_counts(rows) -> list[AnnotatedTag]:
+        tags: dict[str, AnnotatedTag] = {}
+        for name, content_type_id, count in rows:
+            if not (entry := registry.get_for_content_type(content_type_id)):
+                continue  # target model no longer bookmarkable
+            tag = tags.setdefault(name, AnnotatedTag(name=name, counts=[]))
+            tag.counts.append((entry, count))
+        return list(tags.values())
 
 
-class MarkedTags(models.Manager):
+class MarkedTags(models.Manager.from_queryset(BookmarkQuerySet)):
     def _bookmarker_by_user(self, user):
         """Each user may have bookmarked objects. This fetches all bookmarks made by a
         specific user."""
@@ -63,6 +379,7 @@ class MarkedTags(models.Manager):
             .prefetch_related("tags")
             .filter(bookmarker=user)
             .distinct()
+            .with_content_objects()
         )
 
     def extract_from(self, user, tag, content_id: Optional[int] = None) -> QuerySet:
@@ -72,5 +389,5 @@ class MarkedTags(models.Manager):
         represented by the `content_id`."""
         qs = self._bookmarker_by_user(user).filter(tags=tag)
         if content_id:
-            qs = qs.filter(content_type=ContentType.objects.get_for_id(content_id))
+            qs = qs.filter(content_type=content_id)
         return qs
@@ -0,0 +1,216 @@
+"""
+Per-view instrumentation of the Pathmaker routes and of the `bookmarks` views, kept
+in histograms in the memory of the process, enabled by adding the middleware:
+
+```python
+MIDDLEWARE = [
+    "bookmarks.metrics.MetricsMiddleware",  # first, to include the others' queries
+    ...
+]
+```
+
+For each route, the number of queries, the time spent in SQL, the time spent
+rendering templates and the total latency are observed. The staff-only
+`bookmarks:metrics` view exposes them in the Prometheus text format or, with
+`?format=json`, as JSON. Each process has its own histograms, so each must be scraped.
+
+Queries are timed by a wrapper installed once on every database connection, which
+finds the histograms of the current request through a context variable; the
+variable is carried into the threads of `sync_to_async()`, unlike the connection.
+Rendering is timed from `process_template_response()` to a post-render callback of
+the response, so that the response processing of the middleware below, e.g. saving
+the session, is not counted as rendering.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+
+from .cache import cache_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+METRICS = {
+    "request_duration_seconds": ("Total latency", LATENCY_BUCKETS),
+    "sql_duration_seconds": ("Time spent executing queries", LATENCY_BUCKETS),
+    "render_duration_seconds": ("Time spent rendering templates", LATENCY_BUCKETS),
+    "queries": ("Number of queries executed", QUERY_BUCKETS),
+}
+"""Name: (help text, upper bounds of the buckets)"""
+
+
+class Histogram:
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(`le`, count of observations less than or equal to it) per bucket"""
+        total, buckets = 0, []
+        for bound, count in zip((*self.bounds, "+Inf"), self.counts):
+            total += count
+            buckets.append((str(bound), total))
+        return buckets
+
+
+histograms: dict[tuple[str, str], Histogram] = {}
+"""(metric, view): histogram"""
+
+lock = Lock()
+
+
+@dataclass
+class RequestProbe:
+    queries: int = 0
+    sql: float = 0.0
+    render_start: Optional[float] = None
+    render_end: Optional[float] = None
+
+
+current: ContextVar[Optional[RequestProbe]] = ContextVar(
+    "bookmarks_metrics", default=None
+)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection; a no-op outside of a request."""
+    if (probe := current.get()) is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        probe.sql += perf_counter() - start
+        probe.queries += 1
+
+
+def install_wrapper(sender=None, connection=None, **kwargs):
+    """Connections keep their wrappers when they reconnect, hence the check."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def view_label(request: HttpRequest) -> Optional[str]:
+    """The url name of a Pathmaker route or of a `bookmarks` view, else None."""
+    from .models import AbstractBookmarkable
+
+    if not (match := getattr(request, "resolver_match", None)):
+        return None
+    if "bookmarks" in match.app_names:
+        return match.view_name
+    owner = getattr(match.func, "__self__", None)
+    if isinstance(owner, type) and issubclass(owner, AbstractBookmarkable):
+        return match.view_name
+    return None
+
+
+def observe(label: str, probe: RequestProbe, start: float):
+    end = perf_counter()
+    render = 0.0
+    if probe.render_start and probe.render_end:
+        render = probe.render_end - probe.render_start
+    values = {
+        "request_duration_seconds": end - start,
+        "sql_duration_seconds": probe.sql,
+        "render_duration_seconds": render,
+        "queries": probe.queries,
+    }
+    with lock:
+        for metric, value in values.items():
+            if (histogram := histograms.get((metric, label))) is None:
+                histogram = histograms[(metric, label)] = Histogram(METRICS[metric][1])
+            histogram.observe(value)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install_wrapper, dispatch_uid=__name__)
+        for connection in connections.all(initialized_only=True):
+            install_wrapper(connection=connection)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start, probe = perf_counter(), RequestProbe()
+        token = current.set(probe)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        if label := view_label(request):
+            observe(label, probe, start)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        start, probe = perf_counter(), RequestProbe()
+        token = current.set(probe)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        if label := view_label(request):
+            observe(label, probe, start)
+        return response
+
+    def process_template_response(self, request, response):
+        if probe := current.get():
+            probe.render_start = perf_counter()
+
+            def rendered(response):
+                probe.render_end = perf_counter()
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics_json() -> dict:
+    """{view: {metric: {count, sum, buckets}}}, plus the counters of bookmarks.cache"""
+    views = {}
+    with lock:
+        for (metric, label), histogram in sorted(histograms.items()):
+            views.setdefault(label, {})[metric] = {
+                "count": sum(histogram.counts),
+                "sum": histogram.sum,
+                "buckets": dict(histogram.cumulative()),
+            }
+    return {"views": views, "cache": cache_stats()}
+
+
+def metrics_text() -> str:
+    """The Prometheus text exposition format, version 0.0.4"""
+    lines = []
+    with lock:
+        for metric, (help_text, _) in METRICS.items():
+            name = f"bookmarks_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (key, label), histogram in sorted(histograms.items()):
+                if key != metric:
+                    continue
+                view = label.replace("\\", "\\\\").replace('"', '\\"')
+                for le, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{view="{view}",le="{le}"}} {count}')
+                lines.append(f'{name}_sum{{view="{view}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{view="{view}"}} {sum(histogram.counts)}')
+    for key, value in cache_stats().items():
+        name = f"bookmarks_cache_{key}_total"
+        lines += [f"# TYPE {name} counter", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
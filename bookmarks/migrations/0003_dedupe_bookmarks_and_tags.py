@@ -0,0 +1,76 @@
+# Merges rows that would violate the constraints added in 0004_bookmark_constraints:
+# duplicate bookmarks (created by concurrent toggles) and tag names differing only
+# in case (created by concurrent get_or_create calls).
+
+from django.db import migrations
+from django.db.models import Count, Min
+from django.db.models.functions import Lower
+
+
+def merge_into(Tagged, field: str, keep: int, dupes: list[int]):
+    """Repoint the through rows of `dupes` to `keep`, on the `field` side, dropping
+    those that `keep` already has."""
+    other = "tagitem_id" if field == "bookmark_id" else "bookmark_id"
+    existing = Tagged.objects.filter(**{field: keep}).values_list(other, flat=True)
+    rows = Tagged.objects.filter(**{f"{field}__in": dupes})
+    rows.filter(**{f"{other}__in": list(existing)}).delete()
+    for row in rows.order_by(other, "id"):
+        if Tagged.objects.filter(**{field: keep, other: getattr(row, other)}).exists():
+            row.delete()  # two dupes shared the same counterpart
+        else:
+            Tagged.objects.filter(pk=row.pk).update(**{field: keep})
+
+
+def dedupe_tags(apps, schema_editor):
+    TagItem = apps.get_model("bookmarks", "TagItem")
+    Tagged = apps.get_model("bookmarks", "Bookmark").tags.through
+    groups = (
+        TagItem.objects.annotate(lowered=Lower("name"))
+        .values("lowered")
+        .annotate(total=Count("id"), keep=Min("id"))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for group in groups:
+        dupes = list(
+            TagItem.objects.annotate(lowered=Lower("name"))
+            .filter(lowered=group["lowered"])
+            .exclude(pk=group["keep"])
+            .values_list("id", flat=True)
+        )
+        merge_into(Tagged, "tagitem_id", group["keep"], dupes)
+        TagItem.objects.filter(pk__in=dupes).delete()
+    TagItem.objects.exclude(name=Lower("name")).update(name=Lower("name"))
+
+
+def dedupe_bookmarks(apps, schema_editor):
+    Bookmark = apps.get_model("bookmarks", "Bookmark")
+    groups = (
+        Bookmark.objects.values("bookmarker", "content_type", "object_id")
+        .annotate(total=Count("id"), keep=Min("id"))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for group in groups:
+        dupes = list(
+            Bookmark.objects.filter(
+                bookmarker=group["bookmarker"],
+                content_type=group["content_type"],
+                object_id=group["object_id"],
+            )
+            .exclude(pk=group["keep"])
+            .values_list("id", flat=True)
+        )
+        merge_into(Bookmark.tags.through, "bookmark_id", group["keep"], dupes)
+        Bookmark.objects.filter(pk__in=dupes).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookmarks", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_tags, migrations.RunPython.noop),
+        migrations.RunPython(dedupe_bookmarks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:37
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookmarks", "0003_dedupe_bookmarks_and_tags"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tagitem",
+            name="name",
+            field=models.SlugField(max_length=100, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["content_type", "object_id", "bookmarker"],
+                name="bookmark_target_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="bookmark",
+            constraint=models.UniqueConstraint(
+                fields=("bookmarker", "content_type", "object_id"),
+                name="unique_bookmark_per_user",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="tagitem",
+            constraint=models.CheckConstraint(
+                check=models.Q(("name", django.db.models.functions.text.Lower("name"))),
+                name="tag_item_name_lowercase",
+            ),
+        ),
+    ]
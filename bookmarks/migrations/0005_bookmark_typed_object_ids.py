@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookmarks", "0004_bookmark_constraints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bookmark",
+            name="object_id_int",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="bookmark",
+            name="object_id_uuid",
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["content_type", "object_id_int", "bookmarker"],
+                name="bookmark_target_int_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["content_type", "object_id_uuid", "bookmarker"],
+                name="bookmark_target_uuid_idx",
+            ),
+        ),
+    ]
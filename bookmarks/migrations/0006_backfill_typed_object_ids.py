@@ -0,0 +1,68 @@
+# Copies object_id into the typed column added in 0005 for existing bookmarks, after
+# which BOOKMARKS_TYPED_OBJECT_IDS can be switched on.
+
+from uuid import UUID
+
+from django.apps import apps as global_apps
+from django.db import migrations, models
+from django.db.models.functions import Cast
+
+BATCH_SIZE = 2000
+
+TYPED_OBJECT_IDS = {
+    "AutoField": "object_id_int",
+    "BigAutoField": "object_id_int",
+    "SmallAutoField": "object_id_int",
+    "IntegerField": "object_id_int",
+    "BigIntegerField": "object_id_int",
+    "SmallIntegerField": "object_id_int",
+    "PositiveIntegerField": "object_id_int",
+    "PositiveBigIntegerField": "object_id_int",
+    "PositiveSmallIntegerField": "object_id_int",
+    "UUIDField": "object_id_uuid",
+}
+"""Frozen copy of `bookmarks.managers.TYPED_OBJECT_IDS` as of this migration"""
+
+
+def parse_uuid(object_id: str):
+    """None if a legacy `object_id` is not a uuid; its typed column is left empty."""
+    try:
+        return UUID(object_id)
+    except ValueError:
+        return None
+
+
+def backfill(apps, schema_editor):
+    Bookmark = apps.get_model("bookmarks", "Bookmark")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    used = Bookmark.objects.values_list("content_type", flat=True).distinct()
+    for ct in ContentType.objects.filter(pk__in=used):
+        try:  # only the type of the primary key is needed, not its history
+            model = global_apps.get_model(ct.app_label, ct.model)
+        except LookupError:
+            continue
+        if not (field := TYPED_OBJECT_IDS.get(model._meta.pk.get_internal_type())):
+            continue
+        rows = Bookmark.objects.filter(content_type=ct, **{f"{field}__isnull": True})
+        if field == "object_id_int":
+            rows.update(object_id_int=Cast("object_id", models.BigIntegerField()))
+        elif field == "object_id_uuid":
+            last_pk = 0  # malformed rows stay null, so seek past each batch
+            while batch := list(
+                rows.filter(pk__gt=last_pk).order_by("pk")[:BATCH_SIZE]
+            ):
+                for bookmark in batch:
+                    bookmark.object_id_uuid = parse_uuid(bookmark.object_id)
+                Bookmark.objects.bulk_update(batch, ["object_id_uuid"])
+                last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookmarks", "0005_bookmark_typed_object_ids"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bookmarks", "0006_backfill_typed_object_ids"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["bookmarker", "created", "id"], name="bookmark_user_seek_idx"
+            ),
+        ),
+    ]
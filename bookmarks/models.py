@@ -1,5 +1,6 @@
 from typing import Optional
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import (
@@ -7,36 +8,60 @@ from django.contrib.contenttypes.fields import (
     GenericRelation,
 )
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import BadRequest
-from django.db import models
+from django.core.exceptions import BadRequest, ValidationError
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
 from django.db.models.query import QuerySet
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseRedirect,
+    QueryDict,
+)
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
-from django.urls import reverse
 from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.utils.safestring import SafeText
 from django.utils.text import slugify
+from django.utils.timezone import now
 from django_extensions.db.models import TimeStampedModel
 
-from .managers import MarkedTags, UserAnnotations
+from .apps import registry
+from .cache import get_cache, get_panel_contents, get_user_states
+from .managers import (
+    BookmarkableQuerySet,
+    BookmarkQuerySet,
+    MarkedTags,
+    TagItemQuerySet,
+    UserAnnotations,
+    typed_object_id_field,
+)
+from .signals import bookmarks_changed
 from .utils import (
     ADD_TAGS,
+    BULK_MAX,
     DEL_TAG,
     GET_ITEM,
     LAUNCH_MODAL,
+    LIST_PAGE_SIZE,
     MODAL_BASE,
     PANEL,
     TOGGLE_STATUS,
+    aget_object_or_404,
+    aget_user,
+    conditional,
+    panel_state,
 )
 
 
 class TagItem(TimeStampedModel):
-    name = models.SlugField(max_length=100)
+    name = models.SlugField(max_length=100, unique=True)
 
     # managers
-    objects = models.Manager()
+    objects = TagItemQuerySet.as_manager()
     tagged = UserAnnotations()
 
     def __str__(self) -> str:
@@ -47,19 +72,90 @@ class TagItem(TimeStampedModel):
         ordering = ["-created"]
         verbose_name = "Tag Item"
         verbose_name_plural = "Tag Items"
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(name=Lower("name")), name="tag_item_name_lowercase"
+            ),
+        ]
 
     @classmethod
-    def set_context(cls, user, tag_slug: str, model_id: Optional[int] = None):
+    def set_context(
+        cls,
+        user,
+        tag_slug: str,
+        model_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ):
         """The `tag_slug` (and optional `model_id`) from url refer to objects requesting
-        `user` has previously tagged. If user is not authenticated, show empty list."""
+        `user` has previously tagged. If user is not authenticated, show empty list.
+        Only the page following the `cursor` is listed; `next_cursor` is that of the
+        page after, if any."""
         context = {}
         if model_id:
-            context["model_type"] = ContentType.objects.get_for_id(model_id)
-        context["user_tagged_objs"] = Bookmark.objects_tagged.extract_from(
+            if not (model_type := registry.get_for_content_type(model_id)):
+                raise Http404
+            context["model_type"] = model_type
+        qs = Bookmark.objects_tagged.extract_from(
             user, get_object_or_404(TagItem, name=tag_slug), model_id
         )
+        objs, next_cursor = qs.page(cursor, LIST_PAGE_SIZE)
+        context |= {"user_tagged_objs": objs, "next_cursor": next_cursor}
         return context
 
+    @classmethod
+    async def aset_context(
+        cls,
+        user,
+        tag_slug: str,
+        model_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ):
+        """Async set_context(), fetching the tag and the page through the async ORM."""
+        await registry.aload_content_types()
+        context = {}
+        if model_id:
+            if not (model_type := registry.get_for_content_type(model_id)):
+                raise Http404
+            context["model_type"] = model_type
+        tag = await aget_object_or_404(TagItem, name=tag_slug)
+        qs = Bookmark.objects_tagged.extract_from(user, tag, model_id)
+        objs, next_cursor = await qs.apage(cursor, LIST_PAGE_SIZE)
+        context |= {"user_tagged_objs": objs, "next_cursor": next_cursor}
+        return context
+
+    @classmethod
+    def merge(cls, user, names: list[str], into: str) -> int:
+        """Replace the tags of `names` by the tag `into`, inserted if missing, on the
+        bookmarks of `user`; the bookmarks of other users keep theirs. A rename is a
+        merge of a single name. The through rows are rewritten in one transaction by
+        an UPDATE of a row per bookmark and a DELETE of the rows left over, i.e. on
+        bookmarks that already had `into` or more than one of `names`, whatever the
+        number of bookmarks. Returns the number of bookmarks retagged."""
+        into = slugify(into)
+        slugs = {slug for name in names if (slug := slugify(name))} - {into}
+        if not into or not slugs:
+            return 0
+        sources = list(cls.objects.filter(name__in=slugs).values_list("id", flat=True))
+        if not sources:
+            return 0
+
+        Tagged = Bookmark.tags.through
+        mine = Tagged.objects.filter(bookmark__bookmarker=user, tagitem__in=sources)
+        kept = Tagged.objects.filter(bookmark=OuterRef("bookmark"))
+        with transaction.atomic():
+            retagged = Bookmark.objects.filter(pk__in=mine.values("bookmark")).update(
+                modified=now()
+            )
+            if not retagged:  # none of the user's, so no `into` tag to insert
+                return 0
+            target, _ = cls.objects.get_or_create(name=into)
+            mine.exclude(Exists(kept.filter(tagitem=target))).exclude(
+                Exists(kept.filter(tagitem__in=sources, pk__lt=OuterRef("pk")))
+            ).update(tagitem=target)
+            mine.delete()
+        bookmarks_changed.send(sender=cls, user=user, instance=None)
+        return retagged
+
 
 class Bookmark(TimeStampedModel):
     # main fields
@@ -71,23 +167,70 @@ class Bookmark(TimeStampedModel):
     object_id = models.CharField(max_length=250)  # allows UUID
     content_object = GenericForeignKey("content_type", "object_id")
 
+    # typed copies of object_id, see BOOKMARKS_TYPED_OBJECT_IDS
+    object_id_int = models.BigIntegerField(null=True, blank=True)
+    object_id_uuid = models.UUIDField(null=True, blank=True)
+
     # managers
-    objects = models.Manager()
+    objects = BookmarkQuerySet.as_manager()
     objects_tagged = MarkedTags()
 
     def __str__(self):
         return f"{self.bookmarker} saved {self.content_object}"
 
+    def save(self, *args, **kwargs):
+        self.set_typed_object_id()
+        super().save(*args, **kwargs)
+
+    def set_typed_object_id(self):
+        """Copy `object_id` into the typed column matching the primary key of the
+        target's model. Must be called on instances passed to `bulk_create()`."""
+        if not (entry := registry.get_for_content_type(self.content_type_id)):
+            return
+        if field := typed_object_id_field(entry.model):
+            setattr(self, field, entry.model._meta.pk.to_python(self.object_id))
+
     class Meta:
         db_table = "bookmark"
         ordering = ["created"]
         verbose_name = "Bookmarked Object"
         verbose_name_plural = "Bookmarked Objects"
+        indexes = [
+            models.Index(
+                fields=["content_type", "object_id", "bookmarker"],
+                name="bookmark_target_idx",
+            ),
+            models.Index(
+                fields=["content_type", "object_id_int", "bookmarker"],
+                name="bookmark_target_int_idx",
+            ),
+            models.Index(
+                fields=["content_type", "object_id_uuid", "bookmarker"],
+                name="bookmark_target_uuid_idx",
+            ),
+            models.Index(  # see BookmarkQuerySet.after()
+                fields=["bookmarker", "created", "id"],
+                name="bookmark_user_seek_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["bookmarker", "content_type", "object_id"],
+                name="unique_bookmark_per_user",
+            ),
+        ]
 
 
 class AbstractBookmarkable(models.Model):
     bookmarks = GenericRelation(Bookmark, related_query_name="%(app_label)s_%(class)ss")
 
+    # managers
+    objects = BookmarkableQuerySet.as_manager()
+
+    bookmark_select_related: tuple[str, ...] = ()
+    """Relations followed by `object_content_for_panel` and `__str__()`, fetched
+    along with the instance for panels and bookmark listings, e.g. `("author",)`"""
+
     class Meta:
         abstract = True
 
@@ -123,8 +266,7 @@ class AbstractBookmarkable(models.Model):
     def make_action_url(self, act: str):
         """Helper function to help generate urlpattern routes for bookmarking and
         tagging"""
-        base = f"{self._meta.app_label}:{act}_{self._meta.model_name}"
-        return reverse(base, args=(self.pk,))
+        return registry.get(type(self)).action_url(act, self.pk)
 
     @cached_property
     def launch_modal_url(self):
@@ -140,7 +282,7 @@ class AbstractBookmarkable(models.Model):
         if not request.user.is_authenticated:
             return HttpResponseRedirect(settings.LOGIN_URL)
 
-        obj = get_object_or_404(cls, pk=pk)
+        obj = get_object_or_404(cls.objects.for_panels(), pk=pk)
         panel = {"content_template": PANEL}
         context = obj.set_bookmarked_context(request.user) | panel
         return TemplateResponse(request, MODAL_BASE, context)
@@ -158,11 +300,12 @@ class AbstractBookmarkable(models.Model):
         user_slug: Optional[str] = None,
     ):
         """Loads the overriden @object_content_for_panel with tagging and bookmarking
-        functions"""
+        functions. A poll finding the panel unchanged gets a 304 Not Modified, see
+        bookmarks.utils.conditional()."""
         if not request.method == "GET":
             raise BadRequest
 
-        obj = get_object_or_404(cls, pk=pk)
+        obj = get_object_or_404(cls.objects.for_panels(), pk=pk)
         context = {}
         if user_slug:
             if user_found := get_object_or_404(get_user_model(), username=user_slug):
@@ -170,7 +313,8 @@ class AbstractBookmarkable(models.Model):
         else:
             if request.user.is_authenticated:
                 context = obj.set_bookmarked_context(request.user)
-        return TemplateResponse(request, PANEL, context)
+        response = TemplateResponse(request, PANEL, context)
+        return conditional(request, response, request.user.pk, panel_state(context))
 
     @cached_property
     def add_tags_url(self):
@@ -185,7 +329,7 @@ class AbstractBookmarkable(models.Model):
         if not request.user.is_authenticated:
             return HttpResponseRedirect(settings.LOGIN_URL)
 
-        obj = get_object_or_404(cls, pk=pk)
+        obj = get_object_or_404(cls.objects.for_panels(), pk=pk)
         if submitted := request.POST.get("tags"):
             if add_these := submitted.split(","):
                 obj.add_tags(request.user, add_these)
@@ -206,7 +350,7 @@ class AbstractBookmarkable(models.Model):
             return HttpResponseRedirect(settings.LOGIN_URL)
 
         obj = get_object_or_404(cls, pk=pk)
-        if delete_this := request.POST.get("tag"):
+        if delete_this := request.GET.get("tag"):  # see commons/_badge.html
             obj.remove_tag(request.user, delete_this)
         return HttpResponse(headers={"HX-Trigger": "tagDeleted"})
 
@@ -224,26 +368,264 @@ class AbstractBookmarkable(models.Model):
         if not request.user.is_authenticated:
             return HttpResponseRedirect(settings.LOGIN_URL)
 
-        obj = get_object_or_404(cls, pk=pk)
+        obj = get_object_or_404(cls.objects.for_panels(), pk=pk)
         obj.toggle_bookmark(request.user)
         context = obj.set_bookmarked_context(request.user)
         return TemplateResponse(request, PANEL, context)
 
-    def set_bookmarked_context(self, user) -> dict:
+    @classmethod
+    def bulk_func(cls, request: HttpRequest) -> HttpResponse:
+        """Bookmarks, unbookmarks or tags at once the instances of the `pk`s of the
+        POST form, as per its `action`, see bulk_action()"""
+        if not request.method == "POST":
+            raise BadRequest
+        if not request.user.is_authenticated:
+            return HttpResponseRedirect(settings.LOGIN_URL)
+
+        cls.bulk_action(request.user, request.POST)
+        return HttpResponse(headers={"HX-Trigger": "bookmarksChanged"})
+
+    @classmethod
+    def bulk_action(cls, user, data: QueryDict):
+        """`action` is one of `bookmark`, `unbookmark` or `add_tags`, the latter with
+        comma-separated `tags`; at most BULK_MAX `pk`s may be submitted."""
+        pks = data.getlist("pk")
+        if not pks or len(pks) > BULK_MAX:
+            raise BadRequest
+        action = data.get("action")
+        try:
+            if action == "bookmark":
+                cls.bulk_bookmark(user, pks)
+            elif action == "unbookmark":
+                cls.bulk_unbookmark(user, pks)
+            elif action == "add_tags":
+                cls.bulk_add_tags(user, pks, data.get("tags", "").split(","))
+            else:
+                raise BadRequest
+        except (ValueError, ValidationError):
+            raise BadRequest
+
+    @classmethod
+    async def alaunch_modal_func(
+        cls, request: HttpRequest, pk: str
+    ) -> TemplateResponse:
+        """Async launch_modal_func()"""
+        if not request.method == "GET":
+            raise BadRequest
+        if not (user := await aget_user(request)).is_authenticated:
+            return HttpResponseRedirect(settings.LOGIN_URL)
+
+        obj = await aget_object_or_404(cls.objects.for_panels(), pk=pk)
+        panel = {"content_template": PANEL}
+        context = (await obj.aset_bookmarked_context(user)) | panel
+        return TemplateResponse(request, MODAL_BASE, context)
+
+    @classmethod
+    async def aget_item_func(
+        cls,
+        request: HttpRequest,
+        pk: str,
+        user_slug: Optional[str] = None,
+    ):
+        """Async get_item_func()"""
+        if not request.method == "GET":
+            raise BadRequest
+
+        obj = await aget_object_or_404(cls.objects.for_panels(), pk=pk)
+        requester = await aget_user(request)
+        context = {}
+        if user_slug:
+            user = await aget_object_or_404(get_user_model(), username=user_slug)
+            context = await obj.aset_bookmarked_context(user)
+        elif requester.is_authenticated:
+            context = await obj.aset_bookmarked_context(requester)
+        response = TemplateResponse(request, PANEL, context)
+        return conditional(request, response, requester.pk, panel_state(context))
+
+    @classmethod
+    async def aadd_tags_func(cls, request: HttpRequest, pk: str) -> TemplateResponse:
+        """Async add_tags_func(); like the other writes, add_tags() itself is run in
+        a thread rather than duplicated on the async ORM."""
+        if not request.method == "POST":
+            raise BadRequest
+        if not (user := await aget_user(request)).is_authenticated:
+            return HttpResponseRedirect(settings.LOGIN_URL)
+
+        obj = await aget_object_or_404(cls.objects.for_panels(), pk=pk)
+        if submitted := request.POST.get("tags"):
+            if add_these := submitted.split(","):
+                await sync_to_async(obj.add_tags)(user, add_these)
+        context = await obj.aset_bookmarked_context(user)
+        return TemplateResponse(request, PANEL, context)
+
+    @classmethod
+    async def adel_tag_func(cls, request: HttpRequest, pk: str) -> HttpResponse:
+        """Async del_tag_func()"""
+        if not request.method == "DELETE":
+            raise BadRequest
+        if not (user := await aget_user(request)).is_authenticated:
+            return HttpResponseRedirect(settings.LOGIN_URL)
+
+        obj = await aget_object_or_404(cls, pk=pk)
+        if delete_this := request.GET.get("tag"):
+            await sync_to_async(obj.remove_tag)(user, delete_this)
+        return HttpResponse(headers={"HX-Trigger": "tagDeleted"})
+
+    @classmethod
+    async def atoggle_status_func(
+        cls, request: HttpRequest, pk: str
+    ) -> TemplateResponse:
+        """Async toggle_status_func()"""
+        if not request.method == "PUT":
+            return HttpResponseRedirect(settings.LOGIN_URL)
+        if not (user := await aget_user(request)).is_authenticated:
+            return HttpResponseRedirect(settings.LOGIN_URL)
+
+        obj = await aget_object_or_404(cls.objects.for_panels(), pk=pk)
+        await sync_to_async(obj.toggle_bookmark)(user)
+        context = await obj.aset_bookmarked_context(user)
+        return TemplateResponse(request, PANEL, context)
+
+    @classmethod
+    async def abulk_func(cls, request: HttpRequest) -> HttpResponse:
+        """Async bulk_func()"""
+        if not request.method == "POST":
+            raise BadRequest
+        if not (user := await aget_user(request)).is_authenticated:
+            return HttpResponseRedirect(settings.LOGIN_URL)
+
+        await sync_to_async(cls.bulk_action)(user, request.POST)
+        return HttpResponse(headers={"HX-Trigger": "bookmarksChanged"})
+
+    def set_bookmarked_context(
+        self,
+        user,
+        state: Optional[tuple[bool, list[TagItem]]] = None,
+        content: Optional[SafeText] = None,
+    ) -> dict:
         """The tag PANEL in bookmarks/utils.py requires the use of certain variables
         that will not change, e.g. `is_bookmarked`, `toggle_url`. The values that fill
         these constants however will change based on the object instance `obj` and the
-        `user` that is passed to this method."""
+        `user` that is passed to this method. A `state` previously fetched through
+        `get_bookmark_states()` spares the query of `get_bookmark_state()`, and a
+        `content` fetched through `get_panel_contents()` the rendering of
+        `object_content_for_panel`, which may be cached, see bookmarks.cache."""
+        is_bookmarked, user_tags = state or self.get_bookmark_state(user)
+        if content is None:
+            content = get_panel_contents([self])[str(self.pk)]
         return {
             "object": self,
-            "object_content_for_panel": self.object_content_for_panel,
-            "is_bookmarked": self.is_bookmarked(user),
-            "user_tags": self.get_user_tags(user),
+            "object_content_for_panel": content,
+            "is_bookmarked": is_bookmarked,
+            "user_tags": user_tags,
             "toggle_url": self.toggle_status_url,
             "add_tags_url": self.add_tags_url,
             "del_tag_url": self.del_tag_url,
         }
 
+    def get_bookmark_state(self, user) -> tuple[bool, list[TagItem]]:
+        """Combines `is_bookmarked()` and `get_user_tags()` in a single query: the
+        `user`'s bookmark on the instance is left joined with its tags so that a
+        bookmark without tags still yields one row. Served from bookmarks.cache
+        instead, if enabled."""
+        if (cached := self.get_cached_states(user)) is not None:
+            return self.state_from_cache(cached, self.pk)
+        rows = (
+            self.bookmarks.filter(bookmarker=user)
+            .order_by("-tags__created")
+            .values_list("tags__id", "tags__name")
+        )
+        tags = [TagItem(id=pk, name=name) for pk, name in rows if pk]
+        return bool(rows), tags
+
+    async def aset_bookmarked_context(
+        self, user, state: Optional[tuple[bool, list[TagItem]]] = None
+    ) -> dict:
+        """Async `set_bookmarked_context()`. Only `object_content_for_panel`, which
+        may follow foreign keys, is computed in a thread."""
+        state = state or await self.aget_bookmark_state(user)
+        return await sync_to_async(self.set_bookmarked_context)(user, state)
+
+    async def aget_bookmark_state(self, user) -> tuple[bool, list[TagItem]]:
+        """Async `get_bookmark_state()`, iterating over the same rows through the
+        async ORM."""
+        if get_cache():
+            return await sync_to_async(self.get_bookmark_state)(user)
+        rows = [
+            row
+            async for row in self.bookmarks.filter(bookmarker=user)
+            .order_by("-tags__created")
+            .values_list("tags__id", "tags__name")
+        ]
+        tags = [TagItem(id=pk, name=name) for pk, name in rows if pk]
+        return bool(rows), tags
+
+    @classmethod
+    def get_bookmark_states(
+        cls, user, objs: list["AbstractBookmarkable"]
+    ) -> dict[str, tuple[bool, list[TagItem]]]:
+        """Bulk `get_bookmark_state()` of `objs`, keyed by each instance's `pk` as a
+        string, in a single query regardless of the number of `objs`."""
+        if (cached := cls.get_cached_states(user)) is not None:
+            return {str(obj.pk): cls.state_from_cache(cached, obj.pk) for obj in objs}
+        states = {str(obj.pk): (False, []) for obj in objs}
+        rows = (
+            Bookmark.objects.for_objects(cls, [obj.pk for obj in objs])
+            .filter(bookmarker=user)
+            .order_by("-tags__created")
+            .values_list("object_id", "tags__id", "tags__name")
+        )
+        for object_id, pk, name in rows:
+            _, tags = states[object_id]
+            if pk:
+                tags.append(TagItem(id=pk, name=name))
+            states[object_id] = (True, tags)
+        return states
+
+    @classmethod
+    def get_cached_states(cls, user) -> Optional[dict[str, list[tuple[int, str]]]]:
+        """The tags of every `cls` instance bookmarked by `user`, keyed by
+        `object_id`, from bookmarks.cache; None if the cache is disabled."""
+        content_type_id = registry.content_type_id(cls)
+
+        def load():
+            states = {}
+            rows = (
+                Bookmark.objects.filter(bookmarker=user, content_type=content_type_id)
+                .order_by("-tags__created")
+                .values_list("object_id", "tags__id", "tags__name")
+            )
+            for object_id, pk, name in rows:
+                tags = states.setdefault(object_id, [])
+                if pk:
+                    tags.append((pk, name))
+            return states
+
+        return get_user_states(user, content_type_id, load)
+
+    @staticmethod
+    def state_from_cache(cached: dict, pk) -> tuple[bool, list[TagItem]]:
+        if (tags := cached.get(str(pk))) is None:
+            return False, []
+        return True, [TagItem(id=tag_id, name=name) for tag_id, name in tags]
+
+    @classmethod
+    def set_bookmarked_contexts(cls, user, pks: list[str]) -> dict[str, dict]:
+        """Bulk `set_bookmarked_context()` of the instances matching `pks`, keyed by
+        each instance's `pk` as a string. Without a `user`, each context is empty,
+        as in get_item_func()."""
+        objs = list(cls.objects.for_panels().filter(pk__in=pks))
+        if not user:
+            return {str(obj.pk): {} for obj in objs}
+        states = cls.get_bookmark_states(user, objs)
+        contents = get_panel_contents(objs)
+        return {
+            str(obj.pk): obj.set_bookmarked_context(
+                user, states[str(obj.pk)], contents[str(obj.pk)]
+            )
+            for obj in objs
+        }
+
     def is_bookmarked(self, user) -> bool:
         """Has `user` bookmarked to this object instance?"""
         return self.bookmarks.filter(bookmarker=user).exists()
@@ -261,40 +643,114 @@ class AbstractBookmarkable(models.Model):
         return []
 
     def toggle_bookmark(self, user) -> bool:
-        """If `user` is bookmarked to the instance, unbookmark; otherwise, bookmark."""
-        if not self.is_bookmarked(user):
-            return self._bookmark_this(user)
-        return self._unbookmark_this(user)
+        """If `user` is bookmarked to the instance, unbookmark; otherwise, bookmark.
+        Both happen in one transaction, decided by the number of rows deleted rather
+        than by a prior read, so that concurrent toggles, e.g. a double-click, cannot
+        create a duplicate. Returns the status after toggling without reading it
+        back."""
+        with transaction.atomic():
+            status = not self._unbookmark_this(user) and self._bookmark_this(user)
+        bookmarks_changed.send(sender=type(self), user=user, instance=self)
+        return status
 
     def _unbookmark_this(self, user) -> bool:
-        """Implies `user` already bookmarked to the instance. This removes the
-        `bookmark` object from the instance's `bookmarks` field."""
-        bookmark = self.get_bookmarked(user)
-        self.bookmarks.remove(bookmark)
-        if tags := self.get_user_tags(user):
-            tags.delete()
-        return self.is_bookmarked(user)  # status after unbookmarking
+        """Delete the `bookmark` of `user` on the instance, if any. Returns whether
+        there was one."""
+        return bool(self.bookmarks.filter(bookmarker=user).delete_rows())
 
     def _bookmark_this(self, user) -> bool:
-        """Implies `user` is not yet bookmarked to the instance. This add a `bookmark`
-        object to the instance's `bookmarks` field."""
-        bookmark = Bookmark(content_object=self, bookmarker=user)
-        self.bookmarks.add(bookmark, bulk=False)
-        return self.is_bookmarked(user)  # status after bookmark
+        """Insert a `bookmark` of `user` on the instance, unless one was inserted
+        concurrently. Returns the status after bookmarking."""
+        Bookmark.objects.bulk_create(
+            [self.new_bookmark(user, self.pk)], ignore_conflicts=True
+        )
+        return True
+
+    @classmethod
+    def new_bookmark(cls, user, pk) -> Bookmark:
+        """An unsaved bookmark of `user` on the `cls` instance of `pk`, ready for
+        `bulk_create()`."""
+        bookmark = Bookmark(
+            bookmarker=user,
+            content_type_id=registry.content_type_id(cls),
+            object_id=str(pk),
+        )
+        bookmark.set_typed_object_id()
+        return bookmark
 
     def add_tags(self, user, tags_to_add: list[str]):
         """Parse a list of `tags_to_add`, by a `user` to an auto-bookmarked model
-        instance."""
-        if not self.is_bookmarked(user):  # auto-bookmark
-            self._bookmark_this(user)
+        instance. The slugs are deduplicated, missing `TagItem`s are inserted and the
+        through rows are added in bulk so that the number of queries stays the same
+        regardless of the number of `tags_to_add`."""
+        bookmark, _ = self.bookmarks.get_or_create(bookmarker=user)  # auto-bookmark
+        self.tag_bookmarks([bookmark.id], tags_to_add)
+        bookmarks_changed.send(sender=type(self), user=user, instance=self)
+
+    @staticmethod
+    def tag_bookmarks(bookmark_ids: list[int], tags_to_add: list[str]):
+        """Attach the slugs of `tags_to_add` to each of `bookmark_ids`, inserting the
+        missing `TagItem`s, in three queries."""
+        slugs = list(dict.fromkeys(filter(None, map(slugify, tags_to_add))))
+        if not slugs or not bookmark_ids:
+            return
+        TagItem.objects.bulk_create(
+            [TagItem(name=slug) for slug in slugs], ignore_conflicts=True
+        )
+        tag_ids = TagItem.objects.filter(name__in=slugs).values_list("id", flat=True)
+        Tagged = Bookmark.tags.through
+        Tagged.objects.bulk_create(
+            [
+                Tagged(bookmark_id=bookmark_id, tagitem_id=tag_id)
+                for tag_id in tag_ids
+                for bookmark_id in bookmark_ids
+            ],
+            ignore_conflicts=True,
+        )
 
-        bookmark = self.bookmarks.get(bookmarker=user)
-        _existing = list(bookmark.tags.values_list("name", flat=True))
-        for input_name in tags_to_add:
-            slug = slugify(input_name)
-            if slug not in _existing:
-                tag_obj, _ = TagItem.objects.get_or_create(name=slug)
-                bookmark.tags.add(tag_obj)
+    @classmethod
+    def bulk_bookmark(cls, user, pks: list) -> list:
+        """Bookmark the instances among `pks` that exist, in two queries regardless of
+        their number; those already bookmarked are left as they are. Returns the
+        primary keys of the instances found."""
+        found = cls.insert_bookmarks(user, pks)
+        bookmarks_changed.send(sender=cls, user=user, instance=None)
+        return found
+
+    @classmethod
+    def insert_bookmarks(cls, user, pks: list) -> list:
+        found = list(cls.objects.filter(pk__in=pks).values_list("pk", flat=True))
+        Bookmark.objects.bulk_create(
+            [cls.new_bookmark(user, pk) for pk in found], ignore_conflicts=True
+        )
+        return found
+
+    @classmethod
+    def bulk_unbookmark(cls, user, pks: list) -> int:
+        """Unbookmark the instances among `pks`, in two queries regardless of their
+        number. Returns the number of bookmarks deleted."""
+        pks = [cls._meta.pk.to_python(pk) for pk in pks]
+        mine = Bookmark.objects.for_objects(cls, pks).filter(bookmarker=user)
+        with transaction.atomic():
+            deleted = mine.delete_rows()
+        bookmarks_changed.send(sender=cls, user=user, instance=None)
+        return deleted
+
+    @classmethod
+    def bulk_add_tags(cls, user, pks: list, tags_to_add: list[str]) -> list:
+        """Same as `add_tags()` on each of the instances among `pks` that exist, in
+        a constant number of queries. Returns the primary keys of the instances
+        found."""
+        with transaction.atomic():
+            found = cls.insert_bookmarks(user, pks)
+            bookmark_ids = Bookmark.objects.for_objects(cls, found).filter(
+                bookmarker=user
+            )
+            cls.tag_bookmarks(
+                list(bookmark_ids.values_list("id", flat=True)), tags_to_add
+            )
+        bookmarks_changed.send(sender=cls, user=user, instance=None)
+        return found
 
     def remove_tag(self, user, tag_to_remove: str):
         """Since bookmarked instance can have existing tags, enable user to remove an
@@ -308,26 +764,10 @@ class AbstractBookmarkable(models.Model):
         bookmark = self.bookmarks.get(bookmarker=user)
         if bookmark.tags.filter(name=slug).exists():
             bookmark.tags.remove(tag_to_remove)
+        bookmarks_changed.send(sender=type(self), user=user, instance=self)
 
     @classmethod
-    def get_bookmarks_by_user(cls, user):
-        """Get the inheriting model `cls` instances that the user has bookmarked."""
-
-        # what is the inheriting model?
-        ct = ContentType.objects.get(
-            app_label=cls._meta.app_label,
-            model=cls._meta.model_name,
-        )
-
-        # what are the ids of the inheriting model that are included in the Bookmarks
-        # queryset
-        bookmark_ids: list[str] = list(
-            Bookmark.objects.filter(
-                content_type=ct,
-                bookmarker=user,
-            ).values_list("object_id", flat=True)
-        )
-
-        # filter the instances from the ids
-        instances = cls.objects.filter(id__in=bookmark_ids)
-        return instances
+    def get_bookmarks_by_user(cls, user) -> QuerySet:
+        """Get the inheriting model `cls` instances that the user has bookmarked. The
+        queryset is lazy and remains a single query, so it can be paginated."""
+        return cls.objects.bookmarked_by(user)
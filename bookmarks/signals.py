@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+bookmarks_changed = Signal()
+"""Sent with `user` and `instance` whenever the bookmark or the tags of `user` on the
+bookmarkable `instance` change; `sender` is the bookmarkable model. The bulk
+operations, e.g. `bulk_bookmark()`, send it once with `instance=None`, as does
+`TagItem.merge()` with `TagItem` as `sender`."""
@@ -1,9 +1,54 @@
+from typing import Optional
+from urllib.parse import urlencode
+
 from django import template
 from django.db.models import QuerySet
+from django.urls import reverse
+
+from bookmarks.apps import registry
+from bookmarks.models import Bookmark
+from bookmarks.utils import PANEL_BATCH_MAX
 
 register = template.Library()
 
 
+def make_panel_batches(
+    items, batch_size: int, username: Optional[str] = None
+) -> list[dict]:
+    """Split `items`, either bookmarkable instances or `Bookmark`s, into batches of
+    `batch_size`, each with the url of the single get_panels() request that loads
+    all of its panels."""
+    batch_size = min(int(batch_size), PANEL_BATCH_MAX)
+    items = list(items)
+    batches = []
+    for start in range(0, len(items), batch_size):
+        batch = items[start : start + batch_size]
+        query = [("item", make_panel_item(item)) for item in batch]
+        if username:
+            query.append(("user", username))
+        url = f"{reverse('bookmarks:get_panels')}?{urlencode(query)}"
+        batches.append({"items": batch, "url": url})
+    return batches
+
+
+def make_panel_item(item) -> str:
+    """A `Bookmark` already refers to its target object; no need to fetch it."""
+    if isinstance(item, Bookmark):
+        return f"{item.content_type_id}:{item.object_id}"
+    return f"{registry.content_type_id(type(item))}:{item.pk}"
+
+
 @register.inclusion_tag("bookmarks/items_to_load.html")
 def populate_bookmark_items(qs: QuerySet, *args, **kwargs):
-    return {"items_to_load": qs, "username": kwargs.get("username", None)}
+    """With a `batch_size`, panels are loaded through one get_panels() request per
+    batch rather than one get_item_func() request per item. A `next_url`, e.g. of
+    the next page of a listing, is loaded once scrolled past the items."""
+    username = kwargs.get("username", None)
+    context = {
+        "items_to_load": qs,
+        "username": username,
+        "next_url": kwargs.get("next_url"),
+    }
+    if batch_size := kwargs.get("batch_size"):
+        context["batches"] = make_panel_batches(qs, batch_size, username)
+    return context
@@ -0,0 +1,243 @@
+"""
+Bookmarks and tags as JSON Lines, for backups and for moving them between databases;
+see the `export_bookmarks` and `import_bookmarks` management commands.
+
+```json
+{"type": "tag", "id": 1, "name": "omega", "created": "...", "modified": "..."}
+{"type": "bookmark", "bookmarker": "maria", "content_type": "examples.samplebook", "object_id": "1", "tags": [1], "created": "...", "modified": "..."}
+```
+
+Tags come first since the `tags` of each bookmark, i.e. its through rows, refer to
+their exported ids; on import, these are remapped to the ids of the tags of the same
+name. Users and content types are referred to by natural key. Both directions work
+in chunks so that memory stays flat whatever the number of rows, except for the map
+of tag ids.
+"""  # noqa: E501
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from .cache import invalidate_user
+from .managers import prefetch_content_objects
+from .models import Bookmark, TagItem
+
+Tagged = Bookmark.tags.through
+
+
+def export_records(chunk_size: int = 2000) -> Iterator[dict]:
+    """Every tag, then every bookmark with the ids of its tags; rows are read with
+    server-side cursors where supported, `chunk_size` at a time."""
+    tags = TagItem.objects.order_by("pk").values_list(
+        "id", "name", "created", "modified"
+    )
+    for pk, name, created, modified in tags.iterator(chunk_size=chunk_size):
+        yield {
+            "type": "tag",
+            "id": pk,
+            "name": name,
+            "created": created.isoformat(),
+            "modified": modified.isoformat(),
+        }
+
+    bookmarks = Bookmark.objects.order_by("pk").values_list(
+        "id",
+        "bookmarker__username",
+        "content_type__app_label",
+        "content_type__model",
+        "object_id",
+        "created",
+        "modified",
+    )
+    chunk = []
+    for row in bookmarks.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield from export_chunk(chunk)
+            chunk = []
+    yield from export_chunk(chunk)
+
+
+def export_chunk(rows: list[tuple]) -> Iterator[dict]:
+    """The tags of a chunk of bookmark `rows` are fetched in one query."""
+    tags = {row[0]: [] for row in rows}
+    through = Tagged.objects.filter(bookmark_id__in=tags).order_by("pk")
+    for bookmark_id, tag_id in through.values_list("bookmark_id", "tagitem_id"):
+        tags[bookmark_id].append(tag_id)
+    for pk, username, app_label, model, object_id, created, modified in rows:
+        yield {
+            "type": "bookmark",
+            "bookmarker": username,
+            "content_type": f"{app_label}.{model}",
+            "object_id": object_id,
+            "tags": tags[pk],
+            "created": created.isoformat(),
+            "modified": modified.isoformat(),
+        }
+
+
+def user_export_chunks(user, chunk_size: int = 500) -> Iterator[list[dict]]:
+    """The bookmarks of `user`, `chunk_size` at a time, each with the label of its
+    target object and the names of its tags, fetched once per chunk."""
+    bookmarks = (
+        Bookmark.objects.filter(bookmarker=user)
+        .select_related("content_type")
+        .order_by("pk")
+    )
+    chunk = []
+    for bookmark in bookmarks.iterator(chunk_size=chunk_size):
+        chunk.append(bookmark)
+        if len(chunk) == chunk_size:
+            yield user_export_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield user_export_chunk(chunk)
+
+
+def user_export_chunk(bookmarks: list[Bookmark]) -> list[dict]:
+    prefetch_content_objects(bookmarks)
+    names = {bookmark.pk: [] for bookmark in bookmarks}
+    through = Tagged.objects.filter(bookmark_id__in=names).order_by("pk")
+    for bookmark_id, name in through.values_list("bookmark_id", "tagitem__name"):
+        names[bookmark_id].append(name)
+    return [
+        {
+            "created": bookmark.created.isoformat(),
+            "type": bookmark.content_type.name,
+            "object_id": bookmark.object_id,
+            "label": str(bookmark.content_object or ""),
+            "tags": names[bookmark.pk],
+        }
+        for bookmark in bookmarks
+    ]
+
+
+def import_records(lines: Iterable[str], batch_size: int = 2000) -> Counter:
+    """Insert the records of `lines` that are missing from the database, one
+    transaction per `batch_size` records of the same type. Bookmarks of unknown
+    users or content types are skipped. Returns the number of `read` and `skipped`
+    records, of inserted `tags` and `bookmarks`, and of `tagged` rows submitted, of
+    which existing ones are ignored."""
+    counts = Counter()
+    tag_ids: dict[int, int] = {}  # exported id: local id
+    batch, kind = [], None
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if batch and (record["type"] != kind or len(batch) == batch_size):
+            import_batch(kind, batch, tag_ids, counts)
+            batch = []
+        kind = record["type"]
+        batch.append(record)
+        counts["read"] += 1
+    if batch:
+        import_batch(kind, batch, tag_ids, counts)
+    return counts
+
+
+def import_batch(kind: str, records: list[dict], tag_ids: dict, counts: Counter):
+    with transaction.atomic():
+        if kind == "tag":
+            import_tags(records, tag_ids, counts)
+        elif kind == "bookmark":
+            import_bookmarks(records, tag_ids, counts)
+        else:
+            raise ValueError(f"Unknown record type {kind}")
+
+
+def import_tags(records: list[dict], tag_ids: dict, counts: Counter):
+    by_name = {record["name"]: record for record in records}
+    existing = set(
+        TagItem.objects.filter(name__in=by_name).values_list("name", flat=True)
+    )
+    new = [name for name in by_name if name not in existing]
+    TagItem.objects.bulk_create(
+        [TagItem(name=name) for name in new], ignore_conflicts=True
+    )
+    local = dict(TagItem.objects.filter(name__in=by_name).values_list("name", "id"))
+    restore_timestamps(TagItem, [(local[name], by_name[name]) for name in new])
+    for record in records:
+        tag_ids[record["id"]] = local[record["name"]]
+    counts["tags"] += len(new)
+
+
+def import_bookmarks(records: list[dict], tag_ids: dict, counts: Counter):
+    usernames = {record["bookmarker"] for record in records}
+    users = dict(
+        get_user_model()
+        .objects.filter(username__in=usernames)
+        .values_list("username", "id")
+    )
+    by_key = {}  # (bookmarker_id, content_type_id, object_id): record
+    for record in records:
+        try:
+            content_type = ContentType.objects.get_by_natural_key(
+                *record["content_type"].split(".")
+            )
+        except ContentType.DoesNotExist:
+            content_type = None
+        if not content_type or record["bookmarker"] not in users:
+            counts["skipped"] += 1
+            continue
+        user_id = users[record["bookmarker"]]
+        by_key[(user_id, content_type.id, record["object_id"])] = record
+
+    existing = bookmark_ids(by_key)
+    new = []
+    for bookmarker_id, content_type_id, object_id in by_key.keys() - existing.keys():
+        bookmark = Bookmark(
+            bookmarker_id=bookmarker_id,
+            content_type_id=content_type_id,
+            object_id=object_id,
+        )
+        bookmark.set_typed_object_id()
+        new.append(bookmark)
+    Bookmark.objects.bulk_create(new, ignore_conflicts=True)
+    ids = bookmark_ids(by_key)
+    restore_timestamps(
+        Bookmark,
+        [(ids[key], by_key[key]) for key in by_key.keys() - existing.keys()],
+    )
+    counts["bookmarks"] += len(new)
+
+    through = [
+        Tagged(bookmark_id=ids[key], tagitem_id=tag_ids[tag_id])
+        for key, record in by_key.items()
+        for tag_id in record["tags"]
+        if tag_id in tag_ids
+    ]
+    Tagged.objects.bulk_create(through, ignore_conflicts=True)
+    counts["tagged"] += len(through)
+
+    for user_id in {key[0] for key in by_key}:
+        invalidate_user(user_id)
+
+
+def bookmark_ids(keys: Iterable[tuple]) -> dict[tuple, int]:
+    """Ids of the existing bookmarks among `keys` of (bookmarker_id,
+    content_type_id, object_id), through a single query that may match a few more."""
+    keys = set(keys)
+    rows = Bookmark.objects.filter(
+        bookmarker_id__in={key[0] for key in keys},
+        object_id__in={key[2] for key in keys},
+    ).values_list("bookmarker_id", "content_type_id", "object_id", "id")
+    return {row[:3]: row[3] for row in rows if row[:3] in keys}
+
+
+def restore_timestamps(model, pairs: list[tuple[int, dict]]):
+    """`created` and `modified` are set on insert regardless of the given values;
+    `bulk_update()` writes them as given."""
+    objs = [
+        model(
+            pk=pk,
+            created=datetime.fromisoformat(record["created"]),
+            modified=datetime.fromisoformat(record["modified"]),
+        )
+        for pk, record in pairs
+    ]
+    model.objects.bulk_update(objs, ["created", "modified"])
@@ -1,6 +1,29 @@
 from django.urls import path
 
-from .views import annotated_tags, bookmarked_objs, filter_objects_by_tag_model
+from .utils import use_async_views
+
+if use_async_views():
+    from .views import aannotated_tags as annotated_tags
+    from .views import aautocomplete_tags as autocomplete_tags
+    from .views import abookmarked_objs as bookmarked_objs
+    from .views import aexport_bookmarks as export_bookmarks
+    from .views import afilter_objects_by_tag_model as filter_objects_by_tag_model
+    from .views import aget_panels as get_panels
+    from .views import amerge_tags as merge_tags
+    from .views import ametrics as metrics
+    from .views import arename_tag as rename_tag
+else:
+    from .views import (
+        annotated_tags,
+        autocomplete_tags,
+        bookmarked_objs,
+        export_bookmarks,
+        filter_objects_by_tag_model,
+        get_panels,
+        merge_tags,
+        metrics,
+        rename_tag,
+    )
 
 app_name = "bookmarks"
 urlpatterns = [
@@ -14,6 +37,12 @@ urlpatterns = [
         filter_objects_by_tag_model,
         name="filter_objects_by_tag_models",
     ),
+    path("tag/<slug:tag_slug>/rename", rename_tag, name="rename_tag"),
     path("tags", annotated_tags, name="annotated_tags"),
+    path("tags/merge", merge_tags, name="merge_tags"),
+    path("tags/autocomplete", autocomplete_tags, name="autocomplete_tags"),
     path("objs", bookmarked_objs, name="bookmarked_objs"),
+    path("panels", get_panels, name="get_panels"),
+    path("export", export_bookmarks, name="export_bookmarks"),
+    path("metrics", metrics, name="metrics"),
 ]
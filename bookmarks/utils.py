@@ -1,8 +1,15 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from hashlib import md5
 from typing import Callable
 
-from django.db.models import Model
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Model, QuerySet
+from django.http import Http404, HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
 from django.urls import URLPattern, path
+from django.utils.cache import get_conditional_response, patch_cache_control
 
 """
 ACTIONS
@@ -13,6 +20,7 @@ DEL_TAG = "del_tag"
 TOGGLE_STATUS = "toggle_status"
 LAUNCH_MODAL = "launch_modal"
 GET_ITEM = "get_item"
+BULK = "bulk"
 
 
 """
@@ -27,15 +35,120 @@ PANEL = "commons/_panel.html"
 """Content and action panel which will hold the tag form, tag list with delete
 badges, and the bookmarking toggle"""
 
+PANEL_LIST = "bookmarks/panel_list.html"
+"""Multiple content and action panels, rendered in one response by get_panels()"""
+
+PANEL_BATCH_MAX = 100
+"""Maximum number of panels that may be requested from get_panels() at once"""
+
 LIST_BOOKMARKED = "bookmarks/bookmark_list.html"
 """Contains a list of all bookmarked objects"""
 
+LIST_BOOKMARKED_PAGE = "bookmarks/bookmark_page.html"
+"""Next page of bookmarked objects, loaded into LIST_BOOKMARKED on scroll"""
+
 LIST_TAGS = "tags/tag_list.html"
 """Contains a list of all tags used in bookmarked objects"""
 
 LIST_FILTERED = "tags/filter_objects_by_tag_model.html"
 """Lists down bookmarked objects of the user filtered through their tags"""
 
+LIST_FILTERED_PAGE = "tags/filter_objects_by_tag_model_page.html"
+"""Next page of bookmarked objects, loaded into LIST_FILTERED on scroll"""
+
+TAG_OPTIONS = "tags/tag_options.html"
+"""Datalist options completing the tag being typed in the tag form"""
+
+AUTOCOMPLETE_LIMIT = 10
+"""Maximum number of tag names suggested while typing"""
+
+BULK_MAX = 1000
+"""Maximum number of instances that may be submitted to a bulk_func() at once"""
+
+LIST_PAGE_SIZE = 50
+"""Number of bookmarks per page of LIST_BOOKMARKED and LIST_FILTERED"""
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "created,type,object_id,label,tags\r\n"),
+    "ndjson": ("application/x-ndjson", None),
+}
+"""Content type and header line of each format of bookmarks.views.export_bookmarks"""
+
+"""
+ASYNC
+Helpers of the async view functions, see `Pathmaker.use_async`
+"""
+
+
+def use_async_views() -> bool:
+    return getattr(settings, "BOOKMARKS_ASYNC_VIEWS", False)
+
+
+async def aget_user(request: HttpRequest):
+    """The lazy `request.user` reads the session and user tables when first
+    accessed, which cannot be done from the event loop."""
+
+    def resolve():
+        user = request.user
+        user.is_authenticated  # evaluates the lazy object
+        return user
+
+    return await sync_to_async(resolve)()
+
+
+async def aget_object_or_404(klass: type[Model] | QuerySet, **kwargs) -> Model:
+    """Same as `get_object_or_404()` through the async ORM."""
+    queryset = klass if isinstance(klass, QuerySet) else klass._default_manager.all()
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+
+
+"""
+CONDITIONAL
+Responses are rendered lazily, so that a client whose copy is current gets a 304 Not
+Modified without any template being rendered; see `conditional()`
+"""
+
+
+def make_etag(request: HttpRequest, *state) -> str:
+    """Weak ETag of the `state` a response is rendered from. The CSRF secret is
+    included since full pages embed a token derived from it; `get_token()` sets it
+    now, rather than while rendering, so the first ETag is the same as the next."""
+    get_token(request)
+    key = repr((request.META["CSRF_COOKIE"], state)).encode()
+    return f'W/"{md5(key, usedforsecurity=False).hexdigest()}"'
+
+
+def panel_state(context: dict) -> tuple:
+    """What a PANEL is rendered from, given its context, for `make_etag()`"""
+    if not context:
+        return ()
+    return (
+        context["object"]._meta.label,
+        context["object"].pk,
+        context["object_content_for_panel"],
+        context["is_bookmarked"],
+        [(tag.id, tag.name) for tag in context["user_tags"]],
+    )
+
+
+def conditional(request: HttpRequest, response: HttpResponse, *state) -> HttpResponse:
+    """Replace the not yet rendered `response` with a 304 Not Modified if the ETag
+    of its `state` matches the If-None-Match of the `request`. Either way, clients
+    are told to revalidate every time, since the state of a user may change at any
+    moment. There is no Last-Modified: removing a bookmark or a tag leaves no later
+    timestamp behind. While `django.contrib.messages` are pending, the response is
+    always rendered and has no ETag, lest a 304 leave them for a later page."""
+    if not len(get_messages(request)):  # unlike iterating, not marked as used
+        etag = make_etag(request, *state)
+        response = get_conditional_response(request, etag=etag) or response
+        response.headers.setdefault("ETag", etag)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 """
 URLS
 """
@@ -46,28 +159,39 @@ class Pathmaker:
     """Auto-generate patterns with the convention `{act}_{model_klass._meta.model_name}`
     from view functions with respect to: (a) launching a modal inspecting a
     specific `obj` instance of a `model_klass`  (b) adding / deleting tags
-    within the panel with respect to such `obj` instance; and (c)
-    bookmarking / unbookmarking the `obj`."""
+    within the panel with respect to such `obj` instance; (c)
+    bookmarking / unbookmarking the `obj`; and (d) bookmarking, unbookmarking or
+    tagging many instances at once.
+
+    With `use_async`, which defaults to the `BOOKMARKS_ASYNC_VIEWS` setting, the
+    patterns route to the async counterparts of the view functions, e.g.
+    `aget_item_func()`, so that requests served through ASGI do not each take up a
+    thread."""
 
     model_klass: Model
+    use_async: bool = field(default_factory=use_async_views)
+
+    def view(self, act: str) -> Callable:
+        prefix = "a" if self.use_async else ""
+        return getattr(self.model_klass, f"{prefix}{act}_func")
 
     def make_patterns(self) -> list[URLPattern]:
         return [
             # get_item urls
-            self.make_path(GET_ITEM, self.model_klass.get_item_func),
-            self.add_user(GET_ITEM, self.model_klass.get_item_func),
+            self.make_path(GET_ITEM, self.view(GET_ITEM)),
+            self.add_user(GET_ITEM, self.view(GET_ITEM)),
             # launch_modal urls; the value of arg unknown when declared,
             # may be supplied during runtime
-            self.make_path(
-                LAUNCH_MODAL, self.model_klass.launch_modal_func, is_fake=True
-            ),
-            self.make_path(LAUNCH_MODAL, self.model_klass.launch_modal_func),
+            self.make_path(LAUNCH_MODAL, self.view(LAUNCH_MODAL), is_fake=True),
+            self.make_path(LAUNCH_MODAL, self.view(LAUNCH_MODAL)),
             # add tags url
-            self.make_path(ADD_TAGS, self.model_klass.add_tags_func),
+            self.make_path(ADD_TAGS, self.view(ADD_TAGS)),
             # del tag url
-            self.make_path(DEL_TAG, self.model_klass.del_tag_func),
+            self.make_path(DEL_TAG, self.view(DEL_TAG)),
             # toggle bookmark url
-            self.make_path(TOGGLE_STATUS, self.model_klass.toggle_status_func),
+            self.make_path(TOGGLE_STATUS, self.view(TOGGLE_STATUS)),
+            # bulk actions url; the pks are posted
+            self.make_path(BULK, self.view(BULK), is_fake=True),
         ]
 
     def add_user(self, act: str, func: Callable) -> URLPattern:
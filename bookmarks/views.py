@@ -1,37 +1,451 @@
-from typing import Optional
+import csv
+import json
+from collections import defaultdict
+from itertools import chain
+from typing import Iterator, Optional
+from urllib.parse import urlencode
 
-from django.http import HttpRequest
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import BadRequest, PermissionDenied, ValidationError
+from django.db.models import QuerySet
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
+from django.utils.text import slugify
 
-from .models import TagItem
-from .utils import LIST_BOOKMARKED, LIST_FILTERED, LIST_TAGS
+from .apps import registry
+from .autocomplete import complete_tags
+from .managers import AnnotatedTag
+from .metrics import metrics_json, metrics_text
+from .models import Bookmark, TagItem
+from .transfer import user_export_chunks
+from .utils import (
+    AUTOCOMPLETE_LIMIT,
+    BULK_MAX,
+    EXPORT_FORMATS,
+    LIST_BOOKMARKED,
+    LIST_BOOKMARKED_PAGE,
+    LIST_FILTERED,
+    LIST_FILTERED_PAGE,
+    LIST_PAGE_SIZE,
+    LIST_TAGS,
+    PANEL_BATCH_MAX,
+    PANEL_LIST,
+    TAG_OPTIONS,
+    aget_object_or_404,
+    aget_user,
+    conditional,
+    panel_state,
+)
 
 
 def filter_objects_by_tag_model(
     request: HttpRequest, tag_slug: str, model_id: Optional[int] = None
-) -> TemplateResponse:
+) -> HttpResponse:
     """Get objects tagged with `tag_slug`, optionally filtered by `model_id`,
-    assuming user is authenticated."""
+    assuming user is authenticated. See list_response() for pagination."""
+    cursor = request.GET.get("cursor")
     context = {"user_tagged_objs": [], "tag_slug": tag_slug}
     if request.user.is_authenticated:
-        context |= TagItem.set_context(request.user, tag_slug, model_id)
-    return TemplateResponse(request, LIST_FILTERED, context)
+        context |= filtered_page(request.user, tag_slug, model_id, cursor)
+    rows = context["user_tagged_objs"]
+    return list_response(request, LIST_FILTERED, LIST_FILTERED_PAGE, context, rows)
 
 
-def annotated_tags(request: HttpRequest) -> TemplateResponse:
-    from .models import AbstractBookmarkable
-
+def annotated_tags(request: HttpRequest) -> HttpResponse:
     tags = []
     if request.user.is_authenticated:
-        tags = TagItem.tagged.made_by_user(
-            request.user, AbstractBookmarkable.__subclasses__()
-        )
-    return TemplateResponse(request, LIST_TAGS, {"tags": tags})
+        tags = TagItem.tagged.made_by_user(request.user, registry.models)
+    response = TemplateResponse(request, LIST_TAGS, {"tags": tags})
+    return conditional(request, response, request.user.pk, tags_state(tags))
 
 
-def bookmarked_objs(request: HttpRequest) -> TemplateResponse:
-    objs = []
+def bookmarked_objs(request: HttpRequest) -> HttpResponse:
+    """See list_response() for pagination."""
+    cursor = request.GET.get("cursor")
+    context = {"bookmarked_objs": []}
     if request.user.is_authenticated:
-        objs = request.user.bookmark_set.all()
-    context = {"bookmarked_objs": objs}
-    return TemplateResponse(request, LIST_BOOKMARKED, context)
+        context |= bookmarked_page(request.user, cursor)
+    rows = context["bookmarked_objs"]
+    return list_response(request, LIST_BOOKMARKED, LIST_BOOKMARKED_PAGE, context, rows)
+
+
+def filtered_page(user, tag_slug: str, model_id: Optional[int], cursor) -> dict:
+    try:
+        return TagItem.set_context(user, tag_slug, model_id, cursor)
+    except ValueError:
+        raise BadRequest
+
+
+def bookmarked_page(user, cursor: Optional[str]) -> dict:
+    try:
+        qs = user.bookmark_set.with_content_objects()
+        objs, next_cursor = qs.page(cursor, LIST_PAGE_SIZE)
+    except ValueError:
+        raise BadRequest
+    return {"bookmarked_objs": objs, "next_cursor": next_cursor}
+
+
+async def afiltered_page(user, tag_slug: str, model_id: Optional[int], cursor) -> dict:
+    try:
+        return await TagItem.aset_context(user, tag_slug, model_id, cursor)
+    except ValueError:
+        raise BadRequest
+
+
+async def abookmarked_page(user, cursor: Optional[str]) -> dict:
+    try:
+        qs = user.bookmark_set.with_content_objects()
+        objs, next_cursor = await qs.apage(cursor, LIST_PAGE_SIZE)
+    except ValueError:
+        raise BadRequest
+    return {"bookmarked_objs": objs, "next_cursor": next_cursor}
+
+
+def list_response(
+    request: HttpRequest,
+    template: str,
+    page_template: str,
+    context: dict,
+    rows: list[Bookmark],
+) -> HttpResponse:
+    """Listings are paginated on a cursor rather than an offset, see
+    `BookmarkQuerySet.page()`. The first page is rendered in the full `template`;
+    the page following a `cursor` in the querystring is rendered as the
+    `page_template` fragment, which htmx appends to the list on scroll. Both end with
+    the `next_url` of the page after, if any. A revisit finding the bookmark `rows`
+    of the page unchanged gets a 304 Not Modified, see bookmarks.utils.conditional().
+    """
+    if next_cursor := context.get("next_cursor"):
+        context["next_url"] = page_url(request, next_cursor)
+    if "cursor" in request.GET:
+        template = page_template
+    response = TemplateResponse(request, template, context)
+    state = [(row.pk, row.modified, str(row.content_object)) for row in rows]
+    return conditional(request, response, request.user.pk, next_cursor, state)
+
+
+def page_url(request: HttpRequest, cursor: str) -> str:
+    """Url of the page following the `cursor`, on the same route as the `request`"""
+    return f"{request.path}?{urlencode({'cursor': cursor})}"
+
+
+def paged_context(request: HttpRequest, bookmarks: QuerySet, name: str) -> dict:
+    """The page of `bookmarks` following the `cursor` of the `request`, as `name`,
+    with the `next_url` of the page after for `populate_bookmark_items`; for the
+    listings of other apps, e.g. with `BookmarkableQuerySet.bookmarks_of()`."""
+    try:
+        rows, next_cursor = bookmarks.page(request.GET.get("cursor"), LIST_PAGE_SIZE)
+    except ValueError:
+        raise BadRequest
+    context = {name: rows}
+    if next_cursor:
+        context["next_url"] = page_url(request, next_cursor)
+    return context
+
+
+def tags_state(tags: list[AnnotatedTag]) -> list[tuple]:
+    return [
+        (tag.name, [(entry.id, count) for entry, count in tag.counts]) for tag in tags
+    ]
+
+
+def autocomplete_tags(request: HttpRequest) -> TemplateResponse:
+    """Options of the datalist of the tag form, see bookmarks.autocomplete."""
+    if not request.method == "GET":
+        raise BadRequest
+    options = []
+    if request.user.is_authenticated:
+        options = tag_options(request.user, request.GET.get("tags", ""))
+    return TemplateResponse(request, TAG_OPTIONS, {"options": options})
+
+
+def tag_options(user, typed: str) -> list[str]:
+    """Since the input holds comma-separated tags and a datalist option replaces the
+    whole input, each option is what was `typed` with its last tag completed."""
+    *head, last = typed.split(",")
+    head = [slug for part in head if (slug := slugify(part))]
+    names = complete_tags(user, slugify(last), AUTOCOMPLETE_LIMIT + len(head))
+    names = [name for name in names if name not in head][:AUTOCOMPLETE_LIMIT]
+    return [",".join(head + [name]) for name in names]
+
+
+def rename_tag(request: HttpRequest, tag_slug: str) -> HttpResponse:
+    """Renames the tag of `tag_slug` to the submitted `name` on the bookmarks of the
+    user; if the user already has tags of that `name`, the two are merged."""
+    if not request.method == "POST":
+        raise BadRequest
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect(settings.LOGIN_URL)
+    retag(request.user, [tag_slug], request.POST.get("name", ""))
+    return HttpResponse(headers={"HX-Trigger": "tagsChanged"})
+
+
+def merge_tags(request: HttpRequest) -> HttpResponse:
+    """Merges the submitted `tag`s into the tag of the submitted `into` name on the
+    bookmarks of the user."""
+    if not request.method == "POST":
+        raise BadRequest
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect(settings.LOGIN_URL)
+    retag(request.user, request.POST.getlist("tag"), request.POST.get("into", ""))
+    return HttpResponse(headers={"HX-Trigger": "tagsChanged"})
+
+
+def retag(user, names: list[str], into: str) -> int:
+    """See TagItem.merge(); at least one of `names` must exist."""
+    if not names or len(names) > BULK_MAX or not slugify(into):
+        raise BadRequest
+    slugs = [slugify(name) for name in names]
+    if not TagItem.objects.filter(name__in=slugs).exists():
+        raise Http404
+    return TagItem.merge(user, slugs, into)
+
+
+def get_panels(request: HttpRequest) -> HttpResponse:
+    """Batch counterpart of get_item_func(): each `item` of the querystring, formatted
+    as `{content_type_id}:{pk}`, is rendered as a PANEL in a single response. Bookmark
+    and tag state is fetched once per content type rather than once per item. An
+    optional `user` (username) shows that user's state instead of the requester's."""
+    pairs = parse_panel_items(request)
+
+    user = None
+    if user_slug := request.GET.get("user"):
+        user = get_object_or_404(get_user_model(), username=user_slug)
+    elif request.user.is_authenticated:
+        user = request.user
+
+    panels = make_panels(user, pairs)
+    response = TemplateResponse(request, PANEL_LIST, {"panels": panels})
+    state = [panel_state(panel) for panel in panels]
+    return conditional(request, response, request.user.pk, state)
+
+
+def parse_panel_items(request: HttpRequest) -> list[tuple[int, str]]:
+    """The `(content_type_id, pk)` of each `item` requested from get_panels()."""
+    if not request.method == "GET":
+        raise BadRequest
+    items = request.GET.getlist("item")
+    if len(items) > PANEL_BATCH_MAX:
+        raise BadRequest
+
+    pairs = []
+    for item in items:
+        content_type_id, _, pk = item.partition(":")
+        if not content_type_id.isdigit() or not pk:
+            raise BadRequest
+        pairs.append((int(content_type_id), pk))
+    return pairs
+
+
+def make_panels(user, pairs: list[tuple[int, str]]) -> list[dict]:
+    """PANEL contexts of the existing objects among `pairs`, in the same order. Each
+    pk is normalised by its model's pk field, e.g. a uuid given as hex, so that it
+    matches the `str(obj.pk)` keys of set_bookmarked_contexts()."""
+    entries = {}
+    pks_by_type = defaultdict(list)
+    keys = []
+    for content_type_id, pk in pairs:
+        if content_type_id not in entries:
+            if not (entry := registry.get_for_content_type(content_type_id)):
+                raise BadRequest
+            entries[content_type_id] = entry
+        try:
+            pk = str(entries[content_type_id].model._meta.pk.to_python(pk))
+        except ValidationError:
+            raise BadRequest
+        pks_by_type[content_type_id].append(pk)
+        keys.append((content_type_id, pk))
+
+    contexts = {}
+    for content_type_id, pks in pks_by_type.items():
+        model = entries[content_type_id].model
+        try:
+            contexts[content_type_id] = model.set_bookmarked_contexts(user, pks)
+        except (ValueError, ValidationError):
+            raise BadRequest
+
+    return [
+        contexts[content_type_id][pk]
+        for content_type_id, pk in keys
+        if pk in contexts[content_type_id]
+    ]
+
+
+def export_bookmarks(request: HttpRequest) -> HttpResponse:
+    """Download every bookmark of the user, with the label of its target and its
+    tags, as `?format=csv` (default) or `ndjson`. Rows are produced while the
+    response is sent, a chunk of bookmarks at a time, so that memory use does not
+    grow with the number of bookmarks."""
+    export_format = check_export(request)
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect(settings.LOGIN_URL)
+    chunks = user_export_chunks(request.user)
+    lines = (line for chunk in chunks for line in format_export(chunk, export_format))
+    return export_response(lines, export_format)
+
+
+def check_export(request: HttpRequest) -> str:
+    if not request.method == "GET":
+        raise BadRequest
+    if (export_format := request.GET.get("format", "csv")) not in EXPORT_FORMATS:
+        raise BadRequest
+    return export_format
+
+
+class Echo:
+    """File-like object for csv.writer, returning the line instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def format_export(rows: list[dict], export_format: str) -> Iterator[str]:
+    if export_format == "ndjson":
+        for row in rows:
+            yield json.dumps(row) + "\n"
+        return
+    writer = csv.writer(Echo())
+    for row in rows:
+        row["tags"] = ",".join(row["tags"])
+        yield writer.writerow(row.values())
+
+
+def export_response(lines, export_format: str) -> StreamingHttpResponse:
+    content_type, header = EXPORT_FORMATS[export_format]
+    if header:
+        lines = chain([header], lines)
+    return StreamingHttpResponse(
+        lines,
+        content_type=content_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="bookmarks.{export_format}"'
+        },
+    )
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Staff only: the histograms of bookmarks.metrics in the Prometheus text format,
+    or as JSON with `?format=json`."""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return metrics_response(request)
+
+
+def metrics_response(request: HttpRequest) -> HttpResponse:
+    if request.GET.get("format") == "json":
+        return JsonResponse(metrics_json())
+    return HttpResponse(
+        metrics_text(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+"""
+ASYNC
+Counterparts of the views above, routed by urls.py if `BOOKMARKS_ASYNC_VIEWS` is set.
+Queries that cannot be expressed through the async ORM run in a thread.
+"""
+
+
+async def afilter_objects_by_tag_model(
+    request: HttpRequest, tag_slug: str, model_id: Optional[int] = None
+) -> HttpResponse:
+    cursor = request.GET.get("cursor")
+    context = {"user_tagged_objs": [], "tag_slug": tag_slug}
+    if (user := await aget_user(request)).is_authenticated:
+        context |= await afiltered_page(user, tag_slug, model_id, cursor)
+    rows = context["user_tagged_objs"]
+    return list_response(request, LIST_FILTERED, LIST_FILTERED_PAGE, context, rows)
+
+
+async def aannotated_tags(request: HttpRequest) -> HttpResponse:
+    tags = []
+    if (user := await aget_user(request)).is_authenticated:
+        tags = await TagItem.tagged.amade_by_user(user, registry.models)
+    response = TemplateResponse(request, LIST_TAGS, {"tags": tags})
+    return conditional(request, response, user.pk, tags_state(tags))
+
+
+async def abookmarked_objs(request: HttpRequest) -> HttpResponse:
+    cursor = request.GET.get("cursor")
+    context = {"bookmarked_objs": []}
+    if (user := await aget_user(request)).is_authenticated:
+        context |= await abookmarked_page(user, cursor)
+    rows = context["bookmarked_objs"]
+    return list_response(request, LIST_BOOKMARKED, LIST_BOOKMARKED_PAGE, context, rows)
+
+
+async def aautocomplete_tags(request: HttpRequest) -> TemplateResponse:
+    if not request.method == "GET":
+        raise BadRequest
+    options = []
+    if (user := await aget_user(request)).is_authenticated:
+        typed = request.GET.get("tags", "")
+        options = await sync_to_async(tag_options)(user, typed)
+    return TemplateResponse(request, TAG_OPTIONS, {"options": options})
+
+
+async def arename_tag(request: HttpRequest, tag_slug: str) -> HttpResponse:
+    if not request.method == "POST":
+        raise BadRequest
+    if not (user := await aget_user(request)).is_authenticated:
+        return HttpResponseRedirect(settings.LOGIN_URL)
+    await sync_to_async(retag)(user, [tag_slug], request.POST.get("name", ""))
+    return HttpResponse(headers={"HX-Trigger": "tagsChanged"})
+
+
+async def amerge_tags(request: HttpRequest) -> HttpResponse:
+    if not request.method == "POST":
+        raise BadRequest
+    if not (user := await aget_user(request)).is_authenticated:
+        return HttpResponseRedirect(settings.LOGIN_URL)
+    names, into = request.POST.getlist("tag"), request.POST.get("into", "")
+    await sync_to_async(retag)(user, names, into)
+    return HttpResponse(headers={"HX-Trigger": "tagsChanged"})
+
+
+async def aget_panels(request: HttpRequest) -> HttpResponse:
+    pairs = parse_panel_items(request)
+
+    user = None
+    requester = await aget_user(request)
+    if user_slug := request.GET.get("user"):
+        user = await aget_object_or_404(get_user_model(), username=user_slug)
+    elif requester.is_authenticated:
+        user = requester
+
+    panels = await sync_to_async(make_panels)(user, pairs)
+    response = TemplateResponse(request, PANEL_LIST, {"panels": panels})
+    state = [panel_state(panel) for panel in panels]
+    return conditional(request, response, requester.pk, state)
+
+
+async def aexport_bookmarks(request: HttpRequest) -> HttpResponse:
+    """Under ASGI, a sync iterator would be consumed in full before being sent; an
+    async one is streamed, each chunk being fetched in a thread."""
+    export_format = check_export(request)
+    if not (user := await aget_user(request)).is_authenticated:
+        return HttpResponseRedirect(settings.LOGIN_URL)
+
+    async def lines():
+        chunks = user_export_chunks(user)
+        while chunk := await sync_to_async(next)(chunks, None):
+            for line in format_export(chunk, export_format):
+                yield line
+
+    return export_response(lines(), export_format)
+
+
+async def ametrics(request: HttpRequest) -> HttpResponse:
+    if not (await aget_user(request)).is_staff:
+        raise PermissionDenied
+    return metrics_response(request)
@@ -16,6 +16,8 @@ class SampleBook(AbstractBookmarkable):
     excerpt = models.TextField(null=True)
     author = models.ForeignKey(get_user_model(), on_delete=models.PROTECT)
 
+    bookmark_select_related = ("author",)
+
     class Meta:
         verbose_name = "Book"  # see generic relations, e.g. content_type.name
         verbose_name_plural = "Books"
@@ -49,6 +51,8 @@ class SampleQuote(AbstractBookmarkable):
     )
     quote = models.TextField()
 
+    bookmark_select_related = ("book__author",)
+
     class Meta:
         verbose_name = "Quote"  # see generic relations, e.g. content_type.name
         verbose_name_plural = "Quotes"
@@ -3,7 +3,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 
 from bookmarks.models import TagItem
-from examples.models import SampleBook
+from examples.models import SampleBook, SampleQuote
 
 
 @pytest.fixture
@@ -16,6 +16,17 @@ def item(author) -> SampleBook:
     return SampleBook.objects.create(title="sample", author=author)
 
 
+@pytest.fixture
+def books(author) -> list[SampleBook]:
+    books = [SampleBook(title=f"book {i}", author=author) for i in range(30)]
+    return SampleBook.objects.bulk_create(books)
+
+
+@pytest.fixture
+def quote(item) -> SampleQuote:
+    return SampleQuote.objects.create(book=item, quote="sample quote")
+
+
 @pytest.fixture
 def model_id(author) -> int:
     x = ContentType.objects.get_for_model(SampleBook)
@@ -0,0 +1,129 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.http import Http404, HttpResponseRedirect
+from django.test import AsyncRequestFactory
+
+from bookmarks.apps import registry
+from bookmarks.utils import MODAL_BASE, PANEL, PANEL_LIST
+from bookmarks.views import (
+    aannotated_tags,
+    abookmarked_objs,
+    afilter_objects_by_tag_model,
+    aget_panels,
+    arename_tag,
+)
+from examples.models import SampleBook
+
+
+def make_request(method: str, user, data=None):
+    request = getattr(AsyncRequestFactory(), method)("/", data)
+    request.user = user
+    return request
+
+
+@pytest.mark.django_db
+def test_aget_item_func(potential_bookmarker, item_with_tags):
+    request = make_request("get", potential_bookmarker)
+    response = async_to_sync(SampleBook.aget_item_func)(request, pk=item_with_tags.pk)
+    assert response.template_name == PANEL
+    assert response.context_data["is_bookmarked"]
+    assert {t.name for t in response.context_data["user_tags"]} == {"omega", "delta"}
+
+
+@pytest.mark.django_db
+def test_aget_item_func_not_modified(potential_bookmarker, item_with_tags):
+    request = make_request("get", potential_bookmarker)
+    csrf_secret = request.META["CSRF_COOKIE"] = "s" * 32  # as set by the middleware
+    response = async_to_sync(SampleBook.aget_item_func)(request, pk=item_with_tags.pk)
+    request = make_request("get", potential_bookmarker)
+    request.META["CSRF_COOKIE"] = csrf_secret
+    request.META["HTTP_IF_NONE_MATCH"] = response["ETag"]
+    again = async_to_sync(SampleBook.aget_item_func)(request, pk=item_with_tags.pk)
+    assert again.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_aget_item_func_missing(potential_bookmarker):
+    request = make_request("get", potential_bookmarker)
+    with pytest.raises(Http404):
+        async_to_sync(SampleBook.aget_item_func)(request, pk=0)
+
+
+@pytest.mark.django_db
+def test_alaunch_modal_func(potential_bookmarker, item):
+    anonymous = make_request("get", AnonymousUser())
+    response = async_to_sync(SampleBook.alaunch_modal_func)(anonymous, pk=item.pk)
+    assert isinstance(response, HttpResponseRedirect)
+
+    request = make_request("get", potential_bookmarker)
+    response = async_to_sync(SampleBook.alaunch_modal_func)(request, pk=item.pk)
+    assert response.template_name == MODAL_BASE
+    assert not response.context_data["is_bookmarked"]
+
+
+@pytest.mark.django_db
+def test_aadd_tags_and_atoggle_status(potential_bookmarker, item):
+    request = make_request("post", potential_bookmarker, {"tags": "alpha,beta"})
+    response = async_to_sync(SampleBook.aadd_tags_func)(request, pk=item.pk)
+    assert response.context_data["is_bookmarked"]
+    assert {t.name for t in response.context_data["user_tags"]} == {"alpha", "beta"}
+
+    request = make_request("put", potential_bookmarker)
+    response = async_to_sync(SampleBook.atoggle_status_func)(request, pk=item.pk)
+    assert not response.context_data["is_bookmarked"]
+
+
+@pytest.mark.django_db
+def test_adel_tag_func(potential_bookmarker, item_with_tags, tag_name_to_delete):
+    request = make_request("delete", potential_bookmarker)
+    request.GET = {"tag": tag_name_to_delete}
+    response = async_to_sync(SampleBook.adel_tag_func)(request, pk=item_with_tags.pk)
+    assert response.status_code == HTTPStatus.OK
+    names = {tag.name for tag in item_with_tags.get_user_tags(potential_bookmarker)}
+    assert names == {"delta"}
+
+
+@pytest.mark.django_db
+def test_aget_panels(potential_bookmarker, item_with_tags, model_id):
+    request = make_request("get", potential_bookmarker)
+    request.GET = request.GET.copy()
+    request.GET.setlist("item", [f"{model_id}:{item_with_tags.pk}"])
+    response = async_to_sync(aget_panels)(request)
+    assert response.template_name == PANEL_LIST
+    (panel,) = response.context_data["panels"]
+    assert panel["is_bookmarked"]
+
+
+@pytest.mark.django_db
+def test_arename_tag(potential_bookmarker, item_with_tags):
+    request = make_request("post", potential_bookmarker, {"name": "psi"})
+    response = async_to_sync(arename_tag)(request, tag_slug="omega")
+    assert response.status_code == HTTPStatus.OK
+    names = {tag.name for tag in item_with_tags.get_user_tags(potential_bookmarker)}
+    assert names == {"psi", "delta"}
+
+
+@pytest.mark.django_db
+def test_alist_views(potential_bookmarker, item_with_tags, model_id):
+    ContentType.objects.clear_cache()  # loaded in a thread, not from the event loop
+    registry.clear_content_types()
+    request = make_request("get", potential_bookmarker)
+    response = async_to_sync(aannotated_tags)(request)
+    assert [tag.name for tag in response.context_data["tags"]] == ["delta", "omega"]
+
+    response = async_to_sync(abookmarked_objs)(
+        make_request("get", potential_bookmarker)
+    )
+    (bookmark,) = response.context_data["bookmarked_objs"]
+    assert bookmark.content_object == item_with_tags
+
+    request = make_request("get", potential_bookmarker)
+    response = async_to_sync(afilter_objects_by_tag_model)(request, "omega", model_id)
+    assert response.context_data["model_type"].model == SampleBook
+    assert len(response.context_data["user_tagged_objs"]) == 1
+    with pytest.raises(Http404):
+        async_to_sync(afilter_objects_by_tag_model)(request, "missing")
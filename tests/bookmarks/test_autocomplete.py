@@ -0,0 +1,65 @@
+import pytest
+from django.urls import reverse
+
+from bookmarks.autocomplete import UserTags, lists
+from bookmarks.utils import TAG_OPTIONS
+from examples.models import SampleQuote
+
+ROUTE = reverse("bookmarks:autocomplete_tags")
+
+
+@pytest.fixture(autouse=True)
+def clear_lists():
+    lists.clear()
+    yield
+    lists.clear()
+
+
+def test_user_tags_complete():
+    user_tags = UserTags([("data", 1), ("delta", 2), ("django", 3), ("omega", 9)])
+    assert user_tags.complete("d", 10) == ["django", "delta", "data"]
+    assert user_tags.complete("d", 2) == ["django", "delta"]
+    assert user_tags.complete("de", 10) == ["delta"]
+    assert user_tags.complete("x", 10) == []
+
+
+def test_user_tags_complete_punctuation():
+    # as ordered by a collation that ignores punctuation, e.g. en_US.UTF-8
+    rows = [("a-b", 1), ("a_b", 2), ("ab", 3), ("a-c", 4), ("a_c", 5)]
+    user_tags = UserTags(rows)
+    assert user_tags.complete("a-", 10) == ["a-c", "a-b"]
+    assert user_tags.complete("a_", 10) == ["a_c", "a_b"]
+    assert user_tags.complete("ab", 10) == ["ab"]
+
+
+@pytest.mark.django_db
+def test_autocomplete_tags(
+    client, django_assert_num_queries, potential_bookmarker, item_with_tags
+):
+    quote = SampleQuote.objects.create(book=item_with_tags, quote="sample quote")
+    quote.add_tags(potential_bookmarker, ["delta", "dune"])
+    client.force_login(potential_bookmarker)
+
+    response = client.get(ROUTE, {"tags": "omega, D"})
+    assert response.template_name == TAG_OPTIONS
+    assert response.context_data["options"] == ["omega,delta", "omega,dune"]
+
+    with django_assert_num_queries(2):  # session and user, the list is in memory
+        response = client.get(ROUTE, {"tags": "delta,d"})
+    assert response.context_data["options"] == ["delta,dune"]
+
+    quote.add_tags(potential_bookmarker, ["dusk"])  # drops the list
+    response = client.get(ROUTE, {"tags": "du"})
+    assert response.context_data["options"] == ["dune", "dusk"]
+
+    quote.add_tags(potential_bookmarker, ["dune-sea", "dune_sea", "dunes"])
+    response = client.get(ROUTE, {"tags": "dune-s"})
+    assert response.context_data["options"] == ["dune-sea"]
+    response = client.get(ROUTE, {"tags": "dune_s"})
+    assert response.context_data["options"] == ["dune_sea"]
+
+
+@pytest.mark.django_db
+def test_autocomplete_tags_anonymous(client, item_with_tags):
+    response = client.get(ROUTE, {"tags": "o"})
+    assert response.context_data["options"] == []
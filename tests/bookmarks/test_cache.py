@@ -0,0 +1,89 @@
+import pytest
+from django.core.cache import cache
+
+from bookmarks.cache import cache_stats
+
+
+@pytest.fixture
+def state_cache(settings):
+    settings.BOOKMARKS_CACHE = "default"
+    cache.clear()
+    yield cache_stats()
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_cached_state_hit(
+    django_assert_num_queries, state_cache, item_with_tags, potential_bookmarker
+):
+    fresh = item_with_tags.get_bookmark_state(potential_bookmarker)
+    with django_assert_num_queries(0):
+        cached = item_with_tags.get_bookmark_state(potential_bookmarker)
+    assert cached[0] and fresh[0]
+    assert [tag.name for tag in cached[1]] == [tag.name for tag in fresh[1]]
+
+    stats = cache_stats()
+    assert stats["misses"] == state_cache["misses"] + 1
+    assert stats["hits"] == state_cache["hits"] + 1
+
+
+@pytest.mark.django_db
+def test_cached_state_invalidated(
+    state_cache, item_with_tags, potential_bookmarker, tag_name_to_delete
+):
+    def tag_names():
+        return {tag.name for tag in item_with_tags.get_bookmark_state(user)[1]}
+
+    user = potential_bookmarker
+    assert tag_names() == {"omega", "delta"}
+    before = cache_stats()["invalidations"]
+    item_with_tags.add_tags(user, ["epsilon"])
+    assert tag_names() == {"omega", "delta", "epsilon"}
+    item_with_tags.remove_tag(user, tag_name_to_delete)
+    assert tag_names() == {"delta", "epsilon"}
+    item_with_tags.toggle_bookmark(user)
+    assert item_with_tags.get_bookmark_state(user) == (False, [])
+    assert cache_stats()["invalidations"] == before + 3
+
+
+@pytest.mark.django_db
+def test_cached_states_bulk(state_cache, item_with_tags, potential_bookmarker, author):
+    other = type(item_with_tags).objects.create(title="other", author=author)
+    states = type(item_with_tags).get_bookmark_states(
+        potential_bookmarker, [item_with_tags, other]
+    )
+    assert states[str(item_with_tags.pk)][0]
+    assert states[str(other.pk)] == (False, [])
+
+
+@pytest.fixture
+def panel_cache(state_cache, settings):
+    settings.BOOKMARKS_PANEL_CACHE_TIMEOUT = 300
+    return cache_stats()
+
+
+@pytest.mark.django_db
+def test_cached_panel_content(
+    django_assert_num_queries, panel_cache, item_with_tags, potential_bookmarker
+):
+    item_with_tags.set_bookmarked_context(potential_bookmarker)  # stores content
+    item = type(item_with_tags).objects.get(pk=item_with_tags.pk)  # author not joined
+    with django_assert_num_queries(0):  # state and content both cached
+        context = item.set_bookmarked_context(potential_bookmarker)
+    assert item_with_tags.title in context["object_content_for_panel"]
+    assert cache_stats()["panel_hits"] == panel_cache["panel_hits"] + 1
+
+    item.title = "renamed"
+    item.save()
+    context = item.set_bookmarked_context(potential_bookmarker)
+    assert "renamed" in context["object_content_for_panel"]
+
+
+@pytest.mark.django_db
+def test_cached_panel_contents_bulk(panel_cache, item_with_tags, author):
+    model = type(item_with_tags)
+    other = model.objects.create(title="other", author=author)
+    contexts = model.set_bookmarked_contexts(author, [item_with_tags.pk, other.pk])
+    assert "other" in contexts[str(other.pk)]["object_content_for_panel"]
+    contexts = model.set_bookmarked_contexts(author, [item_with_tags.pk, other.pk])
+    assert cache_stats()["panel_hits"] == panel_cache["panel_hits"] + 2
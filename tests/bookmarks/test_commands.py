@@ -0,0 +1,59 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from bookmarks.models import Bookmark, TagItem
+from examples.models import SampleQuote
+
+
+def snapshot():
+    rows = []
+    for bookmark in Bookmark.objects.select_related("bookmarker"):
+        tags = sorted(bookmark.tags.values_list("name", flat=True))
+        username = bookmark.bookmarker.username
+        rows.append((username, bookmark.object_id, bookmark.created, tags))
+    return sorted(rows)
+
+
+@pytest.mark.django_db
+def test_export_import_round_trip(tmp_path, potential_bookmarker, item_with_tags):
+    quote = SampleQuote.objects.create(book=item_with_tags, quote="sample quote")
+    quote.add_tags(potential_bookmarker, ["omega", "gamma"])
+    before = snapshot()
+    out = StringIO()
+    path = tmp_path / "bookmarks.jsonl"
+    call_command("export_bookmarks", output=str(path), chunk_size=1)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["type"] for r in records] == ["tag"] * 3 + ["bookmark"] * 2
+
+    Bookmark.objects.all().delete()
+    TagItem.objects.all().delete()
+    TagItem.objects.create(name="gamma")  # remapped to a new id
+    call_command("import_bookmarks", str(path), batch_size=1)
+    assert snapshot() == before
+    assert Bookmark.objects.get(object_id=str(quote.pk)).object_id_uuid == quote.pk
+
+    call_command("import_bookmarks", str(path), stdout=out)  # nothing to insert
+    assert snapshot() == before
+    assert "inserted 0 tags, 0 bookmarks" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_skips_unknown_users(tmp_path, potential_bookmarker, item_with_tags):
+    path = tmp_path / "bookmarks.jsonl"
+    call_command("export_bookmarks", output=str(path))
+    Bookmark.objects.all().delete()
+    potential_bookmarker.delete()
+    call_command("import_bookmarks", str(path))
+    assert not Bookmark.objects.exists()
+
+
+@pytest.mark.django_db
+def test_delete_orphan_tags(item_with_tags, potential_bookmarker):
+    item_with_tags.toggle_bookmark(potential_bookmarker)
+    out = StringIO()
+    call_command("delete_orphan_tags", "--min-age", "0", stdout=out)
+    assert "Deleted 2 orphan tags" in out.getvalue()
+    assert not TagItem.objects.exists()
@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib import messages
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.urls import reverse
+
+from bookmarks.views import bookmarked_objs
+from examples.models import SampleBook
+
+
+def revalidate(client, url, response, **params):
+    return client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+@pytest.mark.django_db
+def test_get_item_not_modified(client, potential_bookmarker, item_with_tags):
+    client.force_login(potential_bookmarker)
+    url = item_with_tags.get_item_url
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response["ETag"].startswith('W/"')
+    assert "no-cache" in response["Cache-Control"]
+
+    again = revalidate(client, url, response)
+    assert again.status_code == HTTPStatus.NOT_MODIFIED
+    assert again["ETag"] == response["ETag"]
+    assert not again.content
+
+    item_with_tags.remove_tag(potential_bookmarker, "delta")
+    assert revalidate(client, url, response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_get_item_etag_per_user(client, potential_bookmarker, author, item_with_tags):
+    url = item_with_tags.get_item_url
+    client.force_login(potential_bookmarker)
+    response = client.get(url)
+    client.force_login(author)
+    assert revalidate(client, url, response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_get_item_content_changed(client, potential_bookmarker, item_with_tags):
+    client.force_login(potential_bookmarker)
+    url = item_with_tags.get_item_url
+    response = client.get(url)
+    SampleBook.objects.filter(pk=item_with_tags.pk).update(title="changed")
+    assert revalidate(client, url, response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_get_panels_not_modified(client, potential_bookmarker, item_with_tags):
+    client.force_login(potential_bookmarker)
+    url = reverse("bookmarks:get_panels")
+    content_type = ContentType.objects.get_for_model(SampleBook)
+    item = f"{content_type.id}:{item_with_tags.pk}"
+    response = client.get(url, {"item": item})
+    again = revalidate(client, url, response, item=item)
+    assert again.status_code == HTTPStatus.NOT_MODIFIED
+
+    item_with_tags.toggle_bookmark(potential_bookmarker)
+    assert revalidate(client, url, response, item=item).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_lists_not_modified(client, potential_bookmarker, item_with_tags, model_id):
+    client.force_login(potential_bookmarker)
+    kwargs = {"tag_slug": "omega", "model_id": model_id}
+    urls = [
+        reverse("bookmarks:bookmarked_objs"),
+        reverse("bookmarks:annotated_tags"),
+        reverse("bookmarks:filter_objects_by_tag_models", kwargs=kwargs),
+    ]
+    responses = [client.get(url) for url in urls]
+    for url, response in zip(urls, responses):
+        assert revalidate(client, url, response).status_code == HTTPStatus.NOT_MODIFIED
+
+    item_with_tags.toggle_bookmark(potential_bookmarker)
+    for url, response in zip(urls, responses):
+        assert revalidate(client, url, response).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_lists_rendered_with_pending_messages(
+    client, rf, potential_bookmarker, item_with_tags
+):
+    client.force_login(potential_bookmarker)
+    url = reverse("bookmarks:bookmarked_objs")
+    response = client.get(url)
+
+    def request_again():
+        request = rf.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        request.META["CSRF_COOKIE"] = client.cookies["csrftoken"].value
+        request.user = potential_bookmarker
+        request._messages = CookieStorage(request)
+        return request
+
+    assert bookmarked_objs(request_again()).status_code == HTTPStatus.NOT_MODIFIED
+    request = request_again()
+    messages.info(request, "Saved")
+    again = bookmarked_objs(request)
+    assert again.status_code == HTTPStatus.OK
+    assert "ETag" not in again
+    assert "Saved" in again.render().content.decode()
@@ -1,7 +1,10 @@
 import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
 from django.db.models.query import QuerySet
 
 from bookmarks.models import Bookmark, TagItem
+from examples.models import SampleBook, SampleQuote
 
 
 @pytest.mark.django_db
@@ -25,8 +28,8 @@ def test_filter_objects_by_tag_models(potential_bookmarker, item_with_tags):
     context = TagItem.set_context(potential_bookmarker, "omega")
     assert isinstance(context, dict)
     assert "user_tagged_objs" in context
-    assert isinstance(context["user_tagged_objs"], QuerySet)
-    assert context["user_tagged_objs"].count() == 1
+    assert len(context["user_tagged_objs"]) == 1
+    assert context["next_cursor"] is None
 
 
 @pytest.mark.django_db
@@ -36,5 +39,144 @@ def test_filter_objects_by_tag_models_filtered_by_model_id(
     context = TagItem.set_context(potential_bookmarker, "omega", model_id)
     assert isinstance(context, dict)
     assert "user_tagged_objs" in context
-    assert isinstance(context["user_tagged_objs"], QuerySet)
-    assert context["user_tagged_objs"].count() == 1
+    assert len(context["user_tagged_objs"]) == 1
+    assert context["next_cursor"] is None
+
+
+@pytest.mark.django_db
+def test_page_seeks_past_cursor(
+    django_assert_num_queries, potential_bookmarker, author
+):
+    books = [SampleBook.objects.create(title=f"{i}", author=author) for i in range(5)]
+    for book in books:
+        book.toggle_bookmark(potential_bookmarker)
+    qs = Bookmark.objects.filter(bookmarker=potential_bookmarker)
+    pages, cursor = [], None
+    while True:
+        with django_assert_num_queries(1):
+            page, cursor = qs.page(cursor, 2)
+        pages.append([bookmark.content_object for bookmark in page])
+        if not cursor:
+            break
+    assert pages == [books[:2], books[2:4], books[4:]]
+    with pytest.raises(ValueError):
+        qs.page("not-a-cursor", 2)
+
+
+@pytest.mark.django_db
+def test_annotate_bookmarks(
+    django_assert_num_queries, potential_bookmarker, item_with_tags, author
+):
+    SampleBook.objects.create(title="unbookmarked", author=author)
+    with django_assert_num_queries(1):
+        books = list(SampleBook.objects.annotate_bookmarks(potential_bookmarker))
+    marked = {book.pk: book for book in books if book.user_bookmarked}
+    assert list(marked) == [item_with_tags.pk]
+    names = marked[item_with_tags.pk].user_tag_names.split(",")
+    assert set(names) == {"omega", "delta"}
+
+
+@pytest.mark.django_db
+def test_annotate_bookmarks_uuid_pk(potential_bookmarker, item):
+    quote = SampleQuote.objects.create(book=item, quote="sample quote")
+    SampleQuote.objects.create(book=item, quote="unbookmarked")
+    quote.toggle_bookmark(potential_bookmarker)
+    quotes = SampleQuote.objects.annotate_bookmarks(potential_bookmarker)
+    assert [q.pk for q in quotes if q.user_bookmarked] == [quote.pk]
+    assert quotes.get(pk=quote.pk).user_tag_names is None
+
+
+@pytest.mark.django_db
+def test_annotate_bookmarks_anonymous(item):
+    book = SampleBook.objects.annotate_bookmarks(AnonymousUser()).get()
+    assert not book.user_bookmarked
+
+
+@pytest.mark.django_db
+def test_typed_object_ids_filled_on_save(potential_bookmarker, item):
+    quote = SampleQuote.objects.create(book=item, quote="sample quote")
+    item.toggle_bookmark(potential_bookmarker)
+    quote.toggle_bookmark(potential_bookmarker)
+    assert item.bookmarks.get().object_id_int == item.pk
+    assert quote.bookmarks.get().object_id_uuid == quote.pk
+
+
+@pytest.mark.django_db
+def test_typed_object_ids_lookups(settings, potential_bookmarker, item_with_tags):
+    settings.BOOKMARKS_TYPED_OBJECT_IDS = True
+    quote = SampleQuote.objects.create(book=item_with_tags, quote="sample quote")
+    quote.toggle_bookmark(potential_bookmarker)
+
+    quotes = SampleQuote.get_bookmarks_by_user(potential_bookmarker)
+    assert "object_id_uuid" in str(quotes.query)
+    assert list(quotes) == [quote]
+    books = SampleBook.objects.annotate_bookmarks(potential_bookmarker)
+    assert "object_id_int" in str(books.query)
+    assert books.get().user_bookmarked
+    marks = Bookmark.objects.for_objects(SampleBook, [item_with_tags.pk])
+    assert marks.get().bookmarker == potential_bookmarker
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("typed", [False, True])
+def test_bookmarks_of(settings, typed, potential_bookmarker, author, item, books):
+    settings.BOOKMARKS_TYPED_OBJECT_IDS = typed
+    quotes = [SampleQuote.objects.create(book=b, quote="q") for b in (item, *books)]
+    for quote in quotes[:3]:
+        quote.toggle_bookmark(potential_bookmarker)
+    quotes[0].toggle_bookmark(author)
+    of_item = SampleQuote.objects.filter(book=item).bookmarks_of(potential_bookmarker)
+    assert [bookmark.content_object for bookmark in of_item] == [quotes[0]]
+    assert SampleQuote.objects.bookmarks_of(potential_bookmarker).count() == 3
+
+
+@pytest.mark.django_db
+def test_made_by_user_pivots_counts(
+    django_assert_num_queries, potential_bookmarker, item_with_tags
+):
+    quote = SampleQuote.objects.create(book=item_with_tags, quote="sample quote")
+    quote.add_tags(potential_bookmarker, ["omega"])
+    book_type = ContentType.objects.get_for_model(SampleBook)
+    quote_type = ContentType.objects.get_for_model(SampleQuote)
+    with django_assert_num_queries(1):
+        tags = {
+            tag.name: tag for tag in TagItem.tagged.made_by_user(potential_bookmarker)
+        }
+    counts = {entry.id: count for entry, count in tags["omega"].counts}
+    assert counts == {book_type.id: 1, quote_type.id: 1}
+    assert [(e.id, count) for e, count in tags["delta"].counts] == [(book_type.id, 1)]
+
+    only_quotes = TagItem.tagged.made_by_user(potential_bookmarker, [SampleQuote])
+    assert [tag.name for tag in only_quotes] == ["omega"]
+    assert [(e.id, count) for e, count in only_quotes[0].counts] == [(quote_type.id, 1)]
+
+
+@pytest.mark.django_db
+def test_made_by_user_counts_only_own_bookmarks(potential_bookmarker, author):
+    books = [SampleBook.objects.create(title=f"{i}", author=author) for i in range(3)]
+    for book in books:
+        book.add_tags(potential_bookmarker, ["omega"])
+    books[0].add_tags(author, ["omega"])
+    book_type = ContentType.objects.get_for_model(SampleBook)
+    for models in (None, [SampleBook, SampleQuote]):
+        (tag,) = TagItem.tagged.made_by_user(potential_bookmarker, models)
+        assert [(e.id, count) for e, count in tag.counts] == [(book_type.id, 3)]
+
+
+@pytest.mark.django_db
+def test_with_content_objects(django_assert_num_queries, potential_bookmarker, author):
+    books = [SampleBook.objects.create(title=f"{i}", author=author) for i in range(3)]
+    quotes = [SampleQuote.objects.create(book=book, quote="q") for book in books]
+    for obj in books + quotes:
+        obj.toggle_bookmark(potential_bookmarker)
+    qs = Bookmark.objects.filter(bookmarker=potential_bookmarker)
+    with django_assert_num_queries(3):  # bookmarks, then one query per type
+        bookmarks = list(qs.with_content_objects())
+        rendered = [(str(b.content_object), b.content_type.name) for b in bookmarks]
+        panels = [b.content_object.object_content_for_panel for b in bookmarks]
+    assert {b.content_object for b in bookmarks} == set(books + quotes)
+    assert len(rendered) == len(panels) == 6
+
+    books[0].bookmarks.update(object_id="0")  # target gone
+    with django_assert_num_queries(2):
+        assert qs.with_content_objects().after()[0].content_object is None
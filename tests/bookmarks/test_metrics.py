@@ -0,0 +1,117 @@
+from http import HTTPStatus
+from time import sleep
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory
+from django.urls import resolve, reverse
+
+from bookmarks import metrics
+from bookmarks.metrics import Histogram, MetricsMiddleware
+from bookmarks.models import TagItem
+
+
+@pytest.fixture
+def instrumented(settings):
+    settings.MIDDLEWARE = ["bookmarks.metrics.MetricsMiddleware", *settings.MIDDLEWARE]
+    metrics.histograms.clear()
+    yield metrics.histograms
+    metrics.histograms.clear()
+
+
+@pytest.fixture
+def staff():
+    return get_user_model().objects.create_user(
+        username="staff", password="bar", is_staff=True
+    )
+
+
+class SlowResponseMiddleware:
+    """Queries and takes its time on the response path, after rendering."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        TagItem.objects.count()
+        sleep(0.1)
+        return response
+
+
+def test_histogram_buckets():
+    histogram = Histogram((1, 5))
+    for value in (0, 1, 3, 9):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("1", 2), ("5", 3), ("+Inf", 4)]
+    assert histogram.sum == 13
+
+
+@pytest.mark.django_db
+def test_pathmaker_route_observed(client, instrumented, potential_bookmarker, item):
+    client.force_login(potential_bookmarker)
+    client.get(item.get_item_url)
+    label = "examples:get_item_samplebook"
+    queries = instrumented[("queries", label)]
+    assert sum(queries.counts) == 1
+    assert queries.sum >= 2  # the object and the bookmark state, at least
+    assert instrumented[("sql_duration_seconds", label)].sum > 0
+    assert instrumented[("render_duration_seconds", label)].sum > 0
+    assert instrumented[("request_duration_seconds", label)].sum > 0
+
+
+@pytest.mark.django_db
+def test_only_bookmarks_views_observed(client, instrumented, potential_bookmarker):
+    client.force_login(potential_bookmarker)
+    client.get(reverse("bookmarks:annotated_tags"))
+    client.get("/")  # examples' own views are left alone
+    assert {label for _, label in instrumented} == {"bookmarks:annotated_tags"}
+
+
+@pytest.mark.django_db
+def test_render_excludes_inner_middleware(
+    client, instrumented, settings, potential_bookmarker
+):
+    first, *others = settings.MIDDLEWARE
+    settings.MIDDLEWARE = [first, f"{__name__}.SlowResponseMiddleware", *others]
+    client.force_login(potential_bookmarker)
+    client.get(reverse("bookmarks:annotated_tags"))
+    label = "bookmarks:annotated_tags"
+    assert instrumented[("request_duration_seconds", label)].sum >= 0.1
+    assert 0 < instrumented[("render_duration_seconds", label)].sum < 0.1
+
+
+@pytest.mark.django_db
+def test_metrics_view(client, instrumented, potential_bookmarker, staff):
+    url = reverse("bookmarks:metrics")
+    client.force_login(potential_bookmarker)
+    client.get(reverse("bookmarks:bookmarked_objs"))
+    assert client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+    client.force_login(staff)
+    text = client.get(url).content.decode()
+    assert "# TYPE bookmarks_queries histogram" in text
+    view = 'view="bookmarks:bookmarked_objs"'
+    assert f'bookmarks_queries_bucket{{{view},le="+Inf"}} 1' in text
+    assert f"bookmarks_request_duration_seconds_count{{{view}}} 1" in text
+
+    data = client.get(url, {"format": "json"}).json()
+    assert data["views"]["bookmarks:bookmarked_objs"]["queries"]["count"] == 1
+    assert "hits" in data["cache"]
+
+
+@pytest.mark.django_db
+def test_async_middleware(instrumented, potential_bookmarker):
+    async def view(request):
+        await sync_to_async(TagItem.objects.count)()  # in a thread of its own
+        return HttpResponse()
+
+    middleware = MetricsMiddleware(view)
+    request = AsyncRequestFactory().get(reverse("bookmarks:annotated_tags"))
+    request.resolver_match = resolve(request.path)
+    response = async_to_sync(middleware)(request)
+    assert response.status_code == HTTPStatus.OK
+    queries = instrumented[("queries", "bookmarks:annotated_tags")]
+    assert (sum(queries.counts), queries.sum) == (1, 1)
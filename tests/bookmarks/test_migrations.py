@@ -0,0 +1,48 @@
+from uuid import uuid4
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from examples.models import SampleBook, SampleQuote
+
+BEFORE = [("bookmarks", "0005_bookmark_typed_object_ids")]
+AFTER = [("bookmarks", "0006_backfill_typed_object_ids")]
+
+
+def migrate(targets):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()  # reload after the previous run
+    executor.migrate(targets)
+    return executor.loader.project_state(targets).apps
+
+
+@pytest.fixture
+def before_backfill(transactional_db):
+    yield migrate(BEFORE)
+    migrate(MigrationExecutor(connection).loader.graph.leaf_nodes("bookmarks"))
+
+
+def test_backfill_skips_malformed_uuids(before_backfill, potential_bookmarker):
+    Bookmark = before_backfill.get_model("bookmarks", "Bookmark")
+    quote_type = ContentType.objects.get_for_model(SampleQuote).id
+    book_type = ContentType.objects.get_for_model(SampleBook).id
+    good = uuid4()
+    for content_type, object_id in [
+        (quote_type, str(good)),
+        (quote_type, "not-a-uuid"),
+        (book_type, "7"),
+    ]:
+        Bookmark.objects.create(
+            bookmarker_id=potential_bookmarker.pk,
+            content_type_id=content_type,
+            object_id=object_id,
+        )
+
+    apps = migrate(AFTER)
+    Bookmark = apps.get_model("bookmarks", "Bookmark")
+    rows = Bookmark.objects.order_by("pk").values_list(
+        "object_id_uuid", "object_id_int"
+    )
+    assert list(rows) == [(good, None), (None, None), (None, 7)]
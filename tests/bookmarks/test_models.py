@@ -1,4 +1,11 @@
+from datetime import timedelta
+
 import pytest
+from django.db import IntegrityError
+from django.utils.timezone import now
+
+from bookmarks.models import Bookmark, TagItem
+from examples.models import SampleBook, SampleQuote
 
 
 @pytest.mark.django_db
@@ -11,3 +18,128 @@ def test_toggled_bookmark(item, potential_bookmarker):
     assert not item.is_bookmarked(potential_bookmarker)
     assert item.toggle_bookmark(potential_bookmarker)
     assert item.is_bookmarked(potential_bookmarker)
+
+
+@pytest.mark.django_db
+def test_toggle_without_reads(django_assert_num_queries, item_with_tags, author):
+    with django_assert_num_queries(5):  # savepoint, 2 deletes, insert, release
+        assert item_with_tags.toggle_bookmark(author)
+    with django_assert_num_queries(4):  # savepoint, 2 deletes, release
+        assert not item_with_tags.toggle_bookmark(author)
+    assert not item_with_tags.is_bookmarked(author)
+
+
+@pytest.mark.django_db
+def test_toggle_detaches_tags(item_with_tags, potential_bookmarker):
+    assert not item_with_tags.toggle_bookmark(potential_bookmarker)
+    assert not Bookmark.tags.through.objects.exists()
+    assert item_with_tags.toggle_bookmark(potential_bookmarker)
+    assert item_with_tags.get_bookmark_state(potential_bookmarker) == (True, [])
+
+
+@pytest.mark.django_db
+def test_concurrent_bookmark_ignored(item, potential_bookmarker):
+    """A toggle that found nothing to delete, racing with another that inserted."""
+    assert item._bookmark_this(potential_bookmarker)
+    assert item._bookmark_this(potential_bookmarker)
+    assert item.bookmarks.filter(bookmarker=potential_bookmarker).count() == 1
+
+
+@pytest.mark.django_db
+def test_bookmark_state_single_query(
+    django_assert_num_queries, item_with_tags, potential_bookmarker, author
+):
+    with django_assert_num_queries(1):
+        is_bookmarked, tags = item_with_tags.get_bookmark_state(potential_bookmarker)
+    assert is_bookmarked
+    assert {tag.name for tag in tags} == {"omega", "delta"}
+
+    with django_assert_num_queries(1):
+        assert item_with_tags.get_bookmark_state(author) == (False, [])
+
+
+@pytest.mark.django_db
+def test_bookmark_state_without_tags(item, first_bookmarker):
+    assert item.get_bookmark_state(first_bookmarker) == (True, [])
+
+
+@pytest.mark.django_db
+def test_duplicate_bookmark_rejected(item, first_bookmarker):
+    with pytest.raises(IntegrityError):
+        Bookmark.objects.create(content_object=item, bookmarker=first_bookmarker)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", ["omega", "Delta"])
+def test_duplicate_or_uppercase_tag_rejected(item_with_tags, name):
+    with pytest.raises(IntegrityError):
+        TagItem.objects.create(name=name)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("count", [2, 40])
+def test_add_tags_constant_queries(
+    django_assert_num_queries, item_with_tags, potential_bookmarker, count
+):
+    names = ["Omega", "omega", ""] + [f"tag {i}" for i in range(count)]
+    with django_assert_num_queries(4):  # bookmark, tags, tag ids, through rows
+        item_with_tags.add_tags(potential_bookmarker, names)
+    tags = item_with_tags.get_user_tags(potential_bookmarker)
+    assert tags.count() == count + 2  # omega and delta were already added
+
+
+@pytest.mark.django_db
+def test_get_bookmarks_by_user_single_query(
+    django_assert_num_queries, item, potential_bookmarker
+):
+    quote = SampleQuote.objects.create(book=item, quote="sample quote")
+    SampleQuote.objects.create(book=item, quote="unbookmarked")
+    quote.toggle_bookmark(potential_bookmarker)
+    item.toggle_bookmark(potential_bookmarker)
+    with django_assert_num_queries(1):
+        assert list(SampleQuote.get_bookmarks_by_user(potential_bookmarker)) == [quote]
+    assert list(SampleBook.get_bookmarks_by_user(potential_bookmarker)) == [item]
+
+
+@pytest.mark.django_db
+def test_unbookmark_keeps_tags_of_others(item_with_tags, potential_bookmarker, author):
+    item_with_tags.add_tags(author, ["omega"])
+    item_with_tags.toggle_bookmark(potential_bookmarker)
+    assert TagItem.objects.filter(name="omega").exists()
+    assert {tag.name for tag in item_with_tags.get_user_tags(author)} == {"omega"}
+    assert not Bookmark.tags.through.objects.filter(
+        bookmark__bookmarker=potential_bookmarker
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_delete_orphan_tags(item_with_tags, potential_bookmarker):
+    item_with_tags.remove_tag(potential_bookmarker, "delta")
+    TagItem.objects.bulk_create([TagItem(name=f"old-{i}") for i in range(6)])
+    TagItem.objects.update(created=now() - timedelta(days=1))
+    TagItem.objects.create(name="recent")  # may be about to be attached
+
+    assert TagItem.objects.delete_orphans(batch_size=2) == 7
+    assert set(TagItem.objects.values_list("name", flat=True)) == {"omega", "recent"}
+
+
+@pytest.mark.django_db
+def test_delete_orphan_tags_rechecks_in_delete(
+    django_assert_num_queries, item_with_tags, potential_bookmarker
+):
+    """A tag attached after its batch was selected is not deleted, nor is the row
+    attaching it."""
+    TagItem.objects.update(created=now() - timedelta(days=1))
+    batch = TagItem.objects.values_list("pk", flat=True)  # as if all were orphans
+    with django_assert_num_queries(1) as captured:
+        orphans = TagItem.objects.filter(pk__in=batch).orphans()
+        assert orphans._raw_delete(orphans.db) == 0
+    (query,) = captured.captured_queries
+    assert query["sql"].startswith('DELETE FROM "tag_item"')
+    assert item_with_tags.get_bookmark_state(potential_bookmarker)[1]
+
+    item_with_tags.remove_tag(potential_bookmarker, "delta")
+    with django_assert_num_queries(3) as captured:  # batch, delete, empty batch
+        assert TagItem.objects.delete_orphans() == 1
+    deletes = [q["sql"] for q in captured if q["sql"].startswith("DELETE")]
+    assert [sql.split()[2] for sql in deletes] == ['"tag_item"']  # nothing cascaded
@@ -1,10 +1,17 @@
 from http import HTTPStatus
+from unittest.mock import patch
 
 import pytest
 from django.template.response import TemplateResponse
 from django.urls import reverse
 
-from bookmarks.utils import LIST_BOOKMARKED, LIST_FILTERED, LIST_TAGS
+from bookmarks.utils import (
+    LIST_BOOKMARKED,
+    LIST_BOOKMARKED_PAGE,
+    LIST_FILTERED,
+    LIST_TAGS,
+)
+from examples.models import SampleBook, SampleQuote
 
 
 @pytest.mark.django_db
@@ -53,3 +60,69 @@ def test_view_filtered_list(client, potential_bookmarker, item_with_tags, model_
     assert "user_tagged_objs" in response.context_data
     assert response.template_name == LIST_FILTERED
     assert len(response.context_data["user_tagged_objs"]) == 1
+
+
+@pytest.mark.django_db
+def test_view_bookmarked_list_pages(client, potential_bookmarker, author):
+    for i in range(3):
+        book = SampleBook.objects.create(title=f"{i}", author=author)
+        book.toggle_bookmark(potential_bookmarker)
+    client.force_login(potential_bookmarker)
+    with patch("bookmarks.views.LIST_PAGE_SIZE", 2):
+        response = client.get(reverse("bookmarks:bookmarked_objs"))
+        assert response.template_name == LIST_BOOKMARKED
+        assert len(response.context_data["bookmarked_objs"]) == 2
+        next_url = response.context_data["next_url"]
+        assert next_url in response.content.decode()
+
+        response = client.get(next_url)
+        assert response.template_name == LIST_BOOKMARKED_PAGE
+        assert len(response.context_data["bookmarked_objs"]) == 1
+        assert "next_url" not in response.context_data
+
+    response = client.get(reverse("bookmarks:bookmarked_objs"), {"cursor": "bad"})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_saved_books_pages(
+    client, django_assert_num_queries, potential_bookmarker, books
+):
+    SampleBook.bulk_bookmark(potential_bookmarker, [book.pk for book in books])
+    url = reverse("users:get_saved_books", args=[potential_bookmarker.username])
+    with patch("bookmarks.views.LIST_PAGE_SIZE", 20):
+        with django_assert_num_queries(2):  # the user and a page of bookmarks
+            response = client.get(url)
+        assert len(response.context_data["saved"]) == 20
+        content = response.content.decode()
+        assert content.count('hx-trigger="load"') == 1  # a single batch of panels
+        next_url = response.context_data["next_url"]
+        assert next_url in content
+
+        response = client.get(next_url)
+        assert response.template_name == "users/saved_page.html"
+        assert len(response.context_data["saved"]) == 10
+        assert "next_url" not in response.context_data
+
+    assert client.get(url, {"cursor": "bad"}).status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_book_detail_quotes_pages(client, potential_bookmarker, author, item):
+    quotes = [SampleQuote.objects.create(book=item, quote=f"{i}") for i in range(3)]
+    for quote in quotes:
+        quote.toggle_bookmark(potential_bookmarker)
+    other = SampleBook.objects.create(title="other", author=author)
+    SampleQuote.objects.create(book=other, quote="x").toggle_bookmark(
+        potential_bookmarker
+    )
+    client.force_login(potential_bookmarker)
+    with patch("bookmarks.views.LIST_PAGE_SIZE", 2):
+        response = client.get(item.get_absolute_url())
+        page = response.context_data["quotes_saved"]
+        assert [bookmark.object_id for bookmark in page] == [
+            str(quote.pk) for quote in quotes[:2]
+        ]
+        response = client.get(response.context_data["next_url"])
+        assert response.template_name == ["examples/book_detail_page.html"]
+        assert len(response.context_data["quotes_saved"]) == 1
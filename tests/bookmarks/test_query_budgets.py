@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.compare import compare, load_budgets
+from benchmarks.seed import SCALES, seed
+from benchmarks.suite import run_suite
+
+
+@pytest.mark.django_db
+def test_query_budgets():
+    results = run_suite(seed(SCALES["tiny"]), repeat=1)
+    failures, _ = compare(results, load_budgets())
+    assert not failures, "\n".join(failures)
+
+
+def test_compare_flags_query_regressions():
+    timings = {"sql_ms": 1.0, "render_ms": 1.0, "wall_ms": 1.0}
+    base = {"panel": {"queries": 3} | timings}
+    head = {"panel": {"queries": 12} | timings, "new": {"queries": 1} | timings}
+    failures, warnings = compare(head, {"panel": {"queries": 3}}, base)
+    assert len(failures) == 3  # over budget, more than base, missing budget
+    assert not warnings
+
+
+def test_compare_warns_on_slower_timings():
+    base = {"panel": {"queries": 3, "sql_ms": 1.0, "render_ms": 1.0, "wall_ms": 1.0}}
+    head = {"panel": {"queries": 3, "sql_ms": 1.0, "render_ms": 1.0, "wall_ms": 2.0}}
+    failures, warnings = compare(head, {"panel": {"queries": 3}}, base)
+    assert not failures
+    assert warnings == ["panel: wall_ms 2.00, was 1.00"]
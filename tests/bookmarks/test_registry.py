@@ -0,0 +1,51 @@
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.urls import reverse, set_script_prefix
+
+from bookmarks.apps import registry
+from examples.models import SampleBook, SampleQuote
+
+
+def test_registry_finds_concrete_bookmarkables():
+    assert set(registry.models) >= {SampleBook, SampleQuote}
+    entry = registry.get(SampleBook)
+    assert entry.name == SampleBook._meta.verbose_name
+    assert entry.url_name("get_item") == "examples:get_item_samplebook"
+
+
+@pytest.mark.django_db
+def test_registry_content_types(django_assert_num_queries):
+    expected = ContentType.objects.get_for_model(SampleQuote).id
+    registry.content_type_id(SampleBook)  # loaded together on first use
+    with django_assert_num_queries(0):
+        assert registry.content_type_id(SampleQuote) == expected
+        assert registry.get_for_content_type(expected).model is SampleQuote
+        assert registry.get_for_content_type(0) is None
+
+
+@pytest.mark.django_db
+def test_registry_cleared_after_migrate():
+    registry.content_type_id(SampleBook)
+    call_command("migrate", "bookmarks", verbosity=0)
+    assert registry.get(SampleBook).content_type_id is None
+    assert registry.content_type_id(SampleBook) == (
+        ContentType.objects.get_for_model(SampleBook).id
+    )
+
+
+@pytest.mark.parametrize("pk", [1, "a b", "ünï:côdé@!"])
+def test_action_url_matches_reverse(pk):
+    entry = registry.get(SampleBook)
+    for act in ("get_item", "launch_modal", "add_tags", "del_tag", "toggle_status"):
+        assert entry.action_url(act, pk) == reverse(entry.url_name(act), args=(pk,))
+
+
+def test_action_url_follows_script_prefix():
+    entry = registry.get(SampleBook)
+    url = entry.action_url("get_item", 1)
+    set_script_prefix("/mounted/")
+    try:
+        assert entry.action_url("get_item", 1) == "/mounted" + url
+    finally:
+        set_script_prefix("/")
@@ -1,3 +1,5 @@
+import asyncio
+
 from django.urls.resolvers import URLPattern
 
 from bookmarks.utils import Pathmaker
@@ -7,6 +9,13 @@ from examples.models import SampleBook
 def test_Pathmaker_patterns():
     s = Pathmaker(SampleBook)
     patterns = s.make_patterns()
-    assert len(patterns) == 7
+    assert len(patterns) == 8
     for path in patterns:
         assert isinstance(path, URLPattern)
+
+
+def test_Pathmaker_async_patterns():
+    patterns = Pathmaker(SampleBook, use_async=True).make_patterns()
+    assert len(patterns) == 8
+    for path in patterns:
+        assert asyncio.iscoroutinefunction(path.callback)
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+
+from bookmarks.models import Bookmark
+from examples.models import SampleBook, SampleQuote
+
+ROUTE = reverse("examples:bulk_samplebook")
+
+
+@pytest.mark.django_db
+def test_bulk_bookmark(potential_bookmarker, books, item):
+    item.toggle_bookmark(potential_bookmarker)  # already bookmarked, left as is
+    pks = [book.pk for book in books] + [item.pk, 0]
+    found = SampleBook.bulk_bookmark(potential_bookmarker, pks)
+    assert set(found) == set(pks) - {0}
+    assert potential_bookmarker.bookmark_set.count() == 31
+    assert SampleBook.bulk_unbookmark(potential_bookmarker, pks) == 31
+    assert not potential_bookmarker.bookmark_set.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_add_tags(potential_bookmarker, item_with_tags, books):
+    pks = [book.pk for book in books] + [item_with_tags.pk]
+    SampleBook.bulk_add_tags(potential_bookmarker, pks, ["Omega", "new one", ""])
+    tagged = Bookmark.objects.for_objects(SampleBook, pks).filter(
+        bookmarker=potential_bookmarker, tags__name="new-one"
+    )
+    assert tagged.count() == 31
+    state = item_with_tags.get_bookmark_state(potential_bookmarker)
+    assert {tag.name for tag in state[1]} == {"omega", "delta", "new-one"}
+
+
+@pytest.mark.django_db
+def test_bulk_constant_queries(
+    django_assert_num_queries, potential_bookmarker, author, books
+):
+    pks = [book.pk for book in books[:5]]
+    with django_assert_num_queries(8):  # savepoint, 6 queries, release
+        SampleBook.bulk_add_tags(potential_bookmarker, pks, ["alpha", "beta"])
+    pks = [book.pk for book in books]
+    with django_assert_num_queries(8):
+        SampleBook.bulk_add_tags(potential_bookmarker, pks, ["alpha", "gamma"])
+    with django_assert_num_queries(4):  # savepoint, 2 deletes, release
+        SampleBook.bulk_unbookmark(potential_bookmarker, pks)
+
+
+@pytest.mark.django_db
+def test_bulk_uuid_pks(potential_bookmarker, item):
+    quotes = [SampleQuote.objects.create(book=item, quote=f"{i}") for i in range(3)]
+    pks = [quote.pk.hex for quote in quotes]  # accepted in any form
+    SampleQuote.bulk_bookmark(potential_bookmarker, pks)
+    assert SampleQuote.bulk_unbookmark(potential_bookmarker, pks) == 3
+
+
+@pytest.mark.django_db
+def test_bulk_route(client, potential_bookmarker, books):
+    client.force_login(potential_bookmarker)
+    pks = [book.pk for book in books]
+    data = {"action": "add_tags", "pk": pks, "tags": "alpha, beta"}
+    response = client.post(ROUTE, data)
+    assert response.status_code == HTTPStatus.OK
+    assert response["HX-Trigger"] == "bookmarksChanged"
+    assert potential_bookmarker.bookmark_set.filter(tags__name="beta").count() == 30
+
+    response = client.post(ROUTE, {"action": "unbookmark", "pk": pks})
+    assert not potential_bookmarker.bookmark_set.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "data", [{"action": "bookmark"}, {"action": "x", "pk": 1}, {"pk": "a"}]
+)
+def test_bulk_route_bad_requests(client, potential_bookmarker, data):
+    client.force_login(potential_bookmarker)
+    data = {"action": "bookmark"} | data
+    assert client.post(ROUTE, data).status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_bulk_route_limits(client, potential_bookmarker):
+    client.force_login(potential_bookmarker)
+    with patch("bookmarks.models.BULK_MAX", 2):
+        response = client.post(ROUTE, {"action": "bookmark", "pk": [1, 2, 3]})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert client.get(ROUTE).status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_bulk_route_anonymous_redirected(client):
+    response = client.post(ROUTE, {"action": "bookmark", "pk": 1})
+    assert response.status_code == HTTPStatus.FOUND
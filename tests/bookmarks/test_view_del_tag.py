@@ -36,3 +36,5 @@ def test_del_tag(
     assert isinstance(response, HttpResponse)
     assert response.status_code == HTTPStatus.OK
     assert response.headers["HX-Trigger"] == "tagDeleted"
+    names = {tag.name for tag in item_with_tags.get_user_tags(potential_bookmarker)}
+    assert tag_name_to_delete not in names
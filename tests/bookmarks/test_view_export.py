@@ -0,0 +1,67 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponseRedirect
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+
+from bookmarks.views import aexport_bookmarks
+from examples.models import SampleQuote
+
+ROUTE = reverse("bookmarks:export_bookmarks")
+
+
+@pytest.fixture
+def quote(quote, item_with_tags, potential_bookmarker) -> SampleQuote:
+    quote.toggle_bookmark(potential_bookmarker)  # after the tagged item
+    return quote
+
+
+@pytest.mark.django_db
+def test_export_csv(client, potential_bookmarker, item_with_tags, quote):
+    client.force_login(potential_bookmarker)
+    response = client.get(ROUTE)
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"] == "text/csv"
+    content = b"".join(response.streaming_content).decode()
+    rows = list(csv.DictReader(StringIO(content)))
+    assert [row["label"] for row in rows] == [str(item_with_tags), str(quote)]
+    assert set(rows[0]["tags"].split(",")) == {"omega", "delta"}
+    assert rows[1]["tags"] == ""
+    assert rows[1]["object_id"] == str(quote.pk)
+
+
+@pytest.mark.django_db
+def test_export_ndjson(client, potential_bookmarker, item_with_tags, quote):
+    client.force_login(potential_bookmarker)
+    response = client.get(ROUTE, {"format": "ndjson"})
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    first, second = map(json.loads, lines)
+    assert first["type"] == "Book"
+    assert set(first["tags"]) == {"omega", "delta"}
+    assert second["type"] == "Quote"
+
+
+@pytest.mark.django_db
+def test_export_rejected(client, potential_bookmarker):
+    assert isinstance(client.get(ROUTE), HttpResponseRedirect)
+    client.force_login(potential_bookmarker)
+    response = client.get(ROUTE, {"format": "xml"})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_aexport_bookmarks(potential_bookmarker, item_with_tags, quote):
+    request = AsyncRequestFactory().get(ROUTE, {"format": "ndjson"})
+    request.user = potential_bookmarker
+
+    async def consume():
+        response = await aexport_bookmarks(request)
+        return [line async for line in response.streaming_content]
+
+    lines = async_to_sync(consume)()
+    assert len(lines) == 2
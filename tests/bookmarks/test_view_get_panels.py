@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.template.response import TemplateResponse
+from django.urls import reverse
+
+from bookmarks.utils import PANEL_LIST
+from examples.models import SampleBook, SampleQuote
+
+ROUTE = reverse("bookmarks:get_panels")
+
+
+def as_item(obj) -> str:
+    return f"{ContentType.objects.get_for_model(obj).id}:{obj.pk}"
+
+
+@pytest.mark.django_db
+def test_get_panels(client, potential_bookmarker, item_with_tags, quote):
+    client.force_login(potential_bookmarker)
+    response = client.get(ROUTE, {"item": [as_item(quote), as_item(item_with_tags)]})
+    assert isinstance(response, TemplateResponse)
+    assert response.status_code == HTTPStatus.OK
+    assert response.template_name == PANEL_LIST
+
+    first, second = response.context_data["panels"]
+    assert first["object"] == quote
+    assert not first["is_bookmarked"]
+    assert second["object"] == item_with_tags
+    assert second["is_bookmarked"]
+    assert {tag.name for tag in second["user_tags"]} == {"omega", "delta"}
+
+
+@pytest.mark.django_db
+def test_get_panels_constant_queries(
+    client, django_assert_num_queries, potential_bookmarker, books
+):
+    for book in books[:10]:
+        book.add_tags(potential_bookmarker, ["alpha"])
+    client.force_login(potential_bookmarker)
+    # session, user, the books with their authors, bookmark and tag state
+    for count in (5, 20):
+        items = [as_item(book) for book in books[:count]]
+        with django_assert_num_queries(4):
+            response = client.get(ROUTE, {"item": items})
+        assert len(response.context_data["panels"]) == count
+
+
+@pytest.mark.django_db
+def test_get_panels_normalises_pks(client, potential_bookmarker, item, quote):
+    client.force_login(potential_bookmarker)
+    book_type = ContentType.objects.get_for_model(item).id
+    quote_type = ContentType.objects.get_for_model(quote).id
+    items = [f"{quote_type}:{quote.pk.hex}", f"{book_type}:0{item.pk}"]
+    response = client.get(ROUTE, {"item": items})
+    assert [panel["object"] for panel in response.context_data["panels"]] == [
+        quote,
+        item,
+    ]
+    response = client.get(ROUTE, {"item": f"{book_type}:x"})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("item", ["bad", "1:", "999999:1"])
+def test_get_panels_bad_items(client, item):
+    response = client.get(ROUTE, {"item": item})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_get_panels_anonymous_placeholders(client, item):
+    response = client.get(ROUTE, {"item": as_item(item)})
+    assert response.context_data["panels"] == [{}]
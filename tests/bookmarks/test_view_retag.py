@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from bookmarks.models import TagItem
+from examples.models import SampleBook
+
+
+def tag_names(obj, user) -> set[str]:
+    return {tag.name for tag in obj.get_bookmark_state(user)[1]}
+
+
+@pytest.mark.django_db
+def test_rename_only_for_user(item_with_tags, potential_bookmarker, author):
+    item_with_tags.add_tags(author, ["omega"])
+    assert TagItem.merge(potential_bookmarker, ["omega"], "Alpha") == 1
+    assert tag_names(item_with_tags, potential_bookmarker) == {"alpha", "delta"}
+    assert tag_names(item_with_tags, author) == {"omega"}
+
+
+@pytest.mark.django_db
+def test_merge_dedupes(potential_bookmarker, books):
+    first, second, third = books[:3]
+    first.add_tags(potential_bookmarker, ["py", "python", "python3"])
+    second.add_tags(potential_bookmarker, ["py", "python3"])
+    third.add_tags(potential_bookmarker, ["python"])
+    assert TagItem.merge(potential_bookmarker, ["py", "python3"], "python") == 2
+    for book in (first, second, third):
+        assert tag_names(book, potential_bookmarker) == {"python"}
+
+
+@pytest.mark.django_db
+def test_merge_constant_queries(django_assert_num_queries, potential_bookmarker, books):
+    SampleBook.bulk_add_tags(potential_bookmarker, [b.pk for b in books], ["a", "b"])
+    # sources, savepoint, touch, target, update, delete, release
+    with django_assert_num_queries(7):
+        assert TagItem.merge(potential_bookmarker, ["a", "b"], "b") == len(books)
+    assert potential_bookmarker.bookmark_set.filter(tags__name="b").count() == 30
+    assert not potential_bookmarker.bookmark_set.filter(tags__name="a").exists()
+
+
+@pytest.mark.django_db
+def test_merge_nothing(potential_bookmarker, author, item_with_tags):
+    assert TagItem.merge(potential_bookmarker, ["omega"], "omega") == 0
+    assert TagItem.merge(potential_bookmarker, ["missing"], "new") == 0
+    assert TagItem.merge(author, ["omega"], "new") == 0  # none are the author's
+    assert not TagItem.objects.filter(name="new").exists()
+
+
+@pytest.mark.django_db
+def test_rename_tag_route(client, potential_bookmarker, item_with_tags):
+    client.force_login(potential_bookmarker)
+    url = reverse("bookmarks:rename_tag", kwargs={"tag_slug": "omega"})
+    response = client.post(url, {"name": "Omega Prime"})
+    assert response.status_code == HTTPStatus.OK
+    assert response["HX-Trigger"] == "tagsChanged"
+    assert tag_names(item_with_tags, potential_bookmarker) == {"omega-prime", "delta"}
+
+    assert client.post(url, {"name": ""}).status_code == HTTPStatus.BAD_REQUEST
+    url = reverse("bookmarks:rename_tag", kwargs={"tag_slug": "missing"})
+    assert client.post(url, {"name": "x"}).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_merge_tags_route(client, potential_bookmarker, item_with_tags):
+    client.force_login(potential_bookmarker)
+    url = reverse("bookmarks:merge_tags")
+    response = client.post(url, {"tag": ["omega", "delta"], "into": "greek"})
+    assert response.status_code == HTTPStatus.OK
+    assert tag_names(item_with_tags, potential_bookmarker) == {"greek"}
+    assert client.get(url).status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_retag_routes_anonymous_redirected(client):
+    url = reverse("bookmarks:merge_tags")
+    assert client.post(url, {"tag": "a", "into": "b"}).status_code == HTTPStatus.FOUND
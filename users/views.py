@@ -3,6 +3,9 @@ from django.http import HttpRequest
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
 
+from bookmarks.views import paged_context
+from examples.models import SampleBook, SampleQuote
+
 
 def get_user_profile(request: HttpRequest, username: str):
     context: dict = {}
@@ -11,12 +14,20 @@ def get_user_profile(request: HttpRequest, username: str):
 
 
 def get_saved_books(request: HttpRequest, username: str):
-    context: dict = {}
-    context["user_profile"] = get_object_or_404(get_user_model(), username=username)
-    return TemplateResponse(request, "users/saved_books.html", context)
+    return saved_response(request, username, SampleBook, "users/saved_books.html")
 
 
 def get_saved_quotes(request: HttpRequest, username: str):
-    context: dict = {}
-    context["user_profile"] = get_object_or_404(get_user_model(), username=username)
-    return TemplateResponse(request, "users/saved_quotes.html", context)
+    return saved_response(request, username, SampleQuote, "users/saved_quotes.html")
+
+
+def saved_response(request: HttpRequest, username: str, model, template: str):
+    """A page of the bookmarks of the user on instances of `model`; the page after a
+    `cursor` is rendered as a fragment, see bookmarks.views.list_response()."""
+    user_profile = get_object_or_404(get_user_model(), username=username)
+    bookmarks = model.objects.bookmarks_of(user_profile)
+    context = {"user_profile": user_profile}
+    context |= paged_context(request, bookmarks, "saved")
+    if "cursor" in request.GET:
+        template = "users/saved_page.html"
+    return TemplateResponse(request, template, context)